@@ -1,240 +1,2824 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict
-import docker
-from docker.models.containers import Container
-from docker.models.images import Image
-from docker.client import DockerClient
-from docker.errors import APIError
+from typing import List, Tuple, Dict, Iterator, NamedTuple, Callable, TypeVar, TYPE_CHECKING
+from enum import IntEnum, Enum
 import re
 import io
-import tarfile
 import os
 from datetime import datetime
-import uuid
 import time
+import array
+import bisect
+import struct
+import calendar
+import threading
+import json
+import heapq
+import itertools
+import weakref
+import socket
+import functools
+import abc
+
+# the docker sdk, tarfile, uuid, hashlib and concurrent.futures are imported where they are first used, since importing the sdk alone costs hundreds of milliseconds that tools which never reach the daemon should not pay
+if TYPE_CHECKING:
+	from docker.models.containers import Container
+	from docker.models.images import Image
+	from docker.client import DockerClient
+	from docker.api.client import APIClient
+
+
+# every image and container created by a manager carries these labels so that resources leaked by a crashed process can be found later
+DOCKER_MANAGER_SESSION_LABEL = "austin_heller_repo.docker_manager.session"
+DOCKER_MANAGER_PID_LABEL = "austin_heller_repo.docker_manager.pid"
+DOCKER_MANAGER_HOSTNAME_LABEL = "austin_heller_repo.docker_manager.hostname"
+# images in the shared build cache carry this label in place of the session labels, since they are meant to outlive the manager that built them
+DOCKER_MANAGER_BUILD_CACHE_LABEL = "austin_heller_repo.docker_manager.build_cache"
 
 
 class DockerContainerInstanceAlreadyExistsException(Exception):
 
-	def __init__(self, *args: object):
-		super().__init__(*args)
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class FailedToFindContainerException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerContainerAlreadyRemovedException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerCpusetUnavailableException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerStartSchedulerQueueFullException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerStartSchedulerTimeoutException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerCoordinatorTimeoutException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+class DockerContainerNotReadyException(Exception):
+
+	def __init__(self, *args: object):
+		super().__init__(*args)
+
+
+T = TypeVar("T")
+
+
+class DockerTraceSpan(NamedTuple):
+	trace_id: str
+	span_id: str
+	parent_span_id: str
+	name: str
+	start_timestamp: float
+	duration_seconds: float
+	attributes: Dict
+	exception: str
+
+
+class DockerTraceExporter(abc.ABC):
+
+	@abc.abstractmethod
+	def export(self, *, span: DockerTraceSpan):
+		raise NotImplementedError()
+
+	def close(self):
+		pass
+
+
+class DockerNoopTraceExporter(DockerTraceExporter):
+
+	def export(self, *, span: DockerTraceSpan):
+		pass
+
+
+class DockerFileTraceExporter(DockerTraceExporter):
+
+	def __init__(self, *, file_path: str):
+
+		self.__file_path = file_path
+
+		# each span is one JSON line, flushed as it is written so that a crashed process still leaves its spans behind
+		self.__file_handle = open(file_path, "a", buffering=1)
+		self.__lock = threading.Lock()
+
+	def get_file_path(self) -> str:
+		return self.__file_path
+
+	def export(self, *, span: DockerTraceSpan):
+		line = json.dumps(span._asdict(), default=str)
+		with self.__lock:
+			self.__file_handle.write(line + "\n")
+
+	def close(self):
+		with self.__lock:
+			self.__file_handle.close()
+
+
+class DockerActiveTraceSpan():
+
+	def __init__(self, *, exporter: DockerTraceExporter, span_stack: List[DockerActiveTraceSpan], trace_id: str, span_id: str, parent_span_id: str, name: str, attributes: Dict):
+
+		self.__exporter = exporter
+		self.__span_stack = span_stack
+		self.__trace_id = trace_id
+		self.__span_id = span_id
+		self.__parent_span_id = parent_span_id
+		self.__name = name
+		self.__attributes = attributes
+		self.__start_timestamp = None  # type: float
+		self.__start_time = None  # type: float
+
+	def get_trace_id(self) -> str:
+		return self.__trace_id
+
+	def get_span_id(self) -> str:
+		return self.__span_id
+
+	def set_attribute(self, *, key: str, value: object):
+		if self.__attributes is not None:
+			self.__attributes[key] = value
+
+	def __enter__(self) -> DockerActiveTraceSpan:
+		self.__start_timestamp = time.time()
+		self.__start_time = time.perf_counter()
+		self.__span_stack.append(self)
+		return self
+
+	def __exit__(self, exception_type, exception, traceback) -> bool:
+		duration_seconds = time.perf_counter() - self.__start_time
+		if len(self.__span_stack) != 0 and self.__span_stack[-1] is self:
+			self.__span_stack.pop()
+		self.__exporter.export(
+			span=DockerTraceSpan(
+				trace_id=self.__trace_id,
+				span_id=self.__span_id,
+				parent_span_id=self.__parent_span_id,
+				name=self.__name,
+				start_timestamp=self.__start_timestamp,
+				duration_seconds=duration_seconds,
+				attributes=self.__attributes,
+				exception=None if exception is None else f"{exception_type.__name__}: {exception}"
+			)
+		)
+		return False
+
+
+class DockerInertTraceSpan():
+
+	# handed out while tracing is disabled so that instrumented code costs no more than a method call
+	def get_trace_id(self) -> str:
+		return None
+
+	def get_span_id(self) -> str:
+		return None
+
+	def set_attribute(self, *, key: str, value: object):
+		pass
+
+	def __enter__(self) -> DockerInertTraceSpan:
+		return self
+
+	def __exit__(self, exception_type, exception, traceback) -> bool:
+		return False
+
+
+class DockerTracer():
+
+	def __init__(self, *, exporter: DockerTraceExporter = None):
+
+		self.__exporter = DockerNoopTraceExporter() if exporter is None else exporter
+		self.__is_enabled = not isinstance(self.__exporter, DockerNoopTraceExporter)
+
+		# spans nest per thread, and work handed to another thread is parented explicitly through get_context_function
+		self.__thread_local = threading.local()
+		self.__inert_span = DockerInertTraceSpan()
+
+	def is_enabled(self) -> bool:
+		return self.__is_enabled
+
+	def get_exporter(self) -> DockerTraceExporter:
+		return self.__exporter
+
+	def __get_span_stack(self) -> List[DockerActiveTraceSpan]:
+		span_stack = getattr(self.__thread_local, "span_stack", None)
+		if span_stack is None:
+			span_stack = []
+			self.__thread_local.span_stack = span_stack
+		return span_stack
+
+	def get_current_span(self) -> DockerActiveTraceSpan:
+		if not self.__is_enabled:
+			return self.__inert_span
+		span_stack = self.__get_span_stack()
+		if len(span_stack) == 0:
+			return self.__inert_span
+		return span_stack[-1]
+
+	def span(self, *, name: str, attributes: Dict = None) -> DockerActiveTraceSpan:
+		if not self.__is_enabled:
+			return self.__inert_span
+		span_stack = self.__get_span_stack()
+		if len(span_stack) == 0:
+			trace_id = os.urandom(16).hex()
+			parent_span_id = None
+		else:
+			trace_id = span_stack[-1].get_trace_id()
+			parent_span_id = span_stack[-1].get_span_id()
+		return DockerActiveTraceSpan(
+			exporter=self.__exporter,
+			span_stack=span_stack,
+			trace_id=trace_id,
+			span_id=os.urandom(8).hex(),
+			parent_span_id=parent_span_id,
+			name=name,
+			attributes={} if attributes is None else attributes
+		)
+
+	def get_context_function(self, *, function: Callable) -> Callable:
+		# captures the current span so that spans opened by the function on a worker thread nest under it
+		if not self.__is_enabled:
+			return function
+		parent_span = self.get_current_span()
+		if not isinstance(parent_span, DockerActiveTraceSpan):
+			return function
+
+		def context_function(*args, **kwargs):
+			span_stack = self.__get_span_stack()
+			span_stack.append(parent_span)
+			try:
+				return function(*args, **kwargs)
+			finally:
+				span_stack.remove(parent_span)
+
+		return context_function
+
+	def instrument_api_client(self, *, api_client: APIClient):
+		# every Engine API call of the sdk goes through the session's request method, so wrapping it on this one client traces them all
+		if not self.__is_enabled:
+			return
+		from urllib.parse import urlparse
+		request = api_client.request
+
+		def traced_request(method: str, url: str, *args, **kwargs):
+			with self.span(
+				name=f"engine {method.upper()}",
+				attributes={
+					"http.method": method.upper(),
+					"http.path": urlparse(url).path
+				}
+			) as span:
+				data = kwargs.get("data")
+				if isinstance(data, (bytes, bytearray)):
+					span.set_attribute(
+						key="request.bytes",
+						value=len(data)
+					)
+				response = request(method, url, *args, **kwargs)
+				span.set_attribute(
+					key="http.status_code",
+					value=response.status_code
+				)
+				if not kwargs.get("stream"):
+					span.set_attribute(
+						key="response.bytes",
+						value=len(response.content)
+					)
+				return response
+
+		api_client.request = traced_request
+
+	@staticmethod
+	def traced_method(function: Callable) -> Callable:
+		# wraps a public method of a class that provides get_tracer and get_trace_attributes in a span named after the method
+		span_name = function.__qualname__
+
+		@functools.wraps(function)
+		def traced_function(self, *args, **kwargs):
+			tracer = self.get_tracer()
+			if not tracer.is_enabled():
+				return function(self, *args, **kwargs)
+			attributes = self.get_trace_attributes()
+			for key, value in kwargs.items():
+				if isinstance(value, (str, int, float, bool)):
+					attributes[f"argument.{key}"] = value
+				elif isinstance(value, (bytes, bytearray, memoryview)):
+					# payloads are summarized by their size rather than copied into the span
+					attributes[f"argument.{key}.bytes"] = len(value)
+				elif isinstance(value, (list, tuple, dict, set)):
+					attributes[f"argument.{key}.length"] = len(value)
+				elif value is not None:
+					attributes[f"argument.{key}.type"] = type(value).__name__
+			with tracer.span(
+				name=span_name,
+				attributes=attributes
+			):
+				return function(self, *args, **kwargs)
+
+		return traced_function
+
+
+class DockerOutputStreamType(IntEnum):
+	Stdin = 0
+	Stdout = 1
+	Stderr = 2
+
+
+class DockerOutputFrame(NamedTuple):
+	stream_type: DockerOutputStreamType
+	timestamp: float
+	payload: memoryview
+
+
+class DockerLogTimestampParser():
+
+	def __init__(self):
+
+		self.__previous_timestamp_seconds_text = None  # type: bytes
+		self.__previous_timestamp_seconds = None  # type: int
+
+	def get_timestamp(self, *, timestamp_text: bytes) -> float:
+		# docker emits RFC3339Nano timestamps in UTC, such as "2021-10-19T01:02:03.123456789Z", and consecutive lines usually share the same second
+		seconds_text, _, fraction_text = timestamp_text.rstrip(b"Z").partition(b".")
+		if seconds_text != self.__previous_timestamp_seconds_text:
+			self.__previous_timestamp_seconds = calendar.timegm((
+				int(seconds_text[0:4]),
+				int(seconds_text[5:7]),
+				int(seconds_text[8:10]),
+				int(seconds_text[11:13]),
+				int(seconds_text[14:16]),
+				int(seconds_text[17:19])
+			))
+			self.__previous_timestamp_seconds_text = seconds_text
+		if fraction_text:
+			return self.__previous_timestamp_seconds + int(fraction_text) / 10 ** len(fraction_text)
+		return float(self.__previous_timestamp_seconds)
+
+
+class DockerLogStreamParser():
+
+	def __init__(self, *, is_tty: bool):
+
+		self.__is_tty = is_tty
+
+		# a streamed response arrives in chunks that split frames and lines arbitrarily, so the incomplete remainder is carried into the next chunk
+		self.__content = bytearray()
+
+	def append(self, *, chunk: bytes) -> List[Tuple[DockerOutputStreamType, bytes]]:
+		# returns each complete stream-multiplexed frame, or each complete line for tty containers
+		self.__content += chunk
+		payloads = []  # type: List[Tuple[DockerOutputStreamType, bytes]]
+		content_index = 0
+		while True:
+			if self.__is_tty:
+				payload_end_index = self.__content.find(b"\n", content_index)
+				if payload_end_index == -1:
+					break
+				payload_end_index += 1
+				payloads.append((DockerOutputStreamType.Stdout, bytes(self.__content[content_index:payload_end_index])))
+			else:
+				if len(self.__content) - content_index < 8:
+					break
+				stream_type, payload_length = struct.unpack_from(">BxxxL", self.__content, content_index)
+				payload_end_index = content_index + 8 + payload_length
+				if payload_end_index > len(self.__content):
+					break
+				payloads.append((DockerOutputStreamType(stream_type), bytes(self.__content[content_index + 8:payload_end_index])))
+			content_index = payload_end_index
+		del self.__content[:content_index]
+		return payloads
+
+
+class DockerOutputFrameBuffer():
+
+	def __init__(self, *, maximum_payload_bytes_total: int = None):
+
+		self.__maximum_payload_bytes_total = maximum_payload_bytes_total
+
+		# each frame is a slice of an immutable block (usually the raw response body it arrived in) so that appending never copies payloads and reading only hands out views
+		self.__blocks = []  # type: List[bytes]
+		self.__stream_types = array.array("B")
+		self.__timestamps = array.array("d")
+		self.__block_indexes = array.array("I")
+		self.__payload_start_indexes = array.array("Q")
+		self.__payload_lengths = array.array("Q")
+		self.__is_sorted_by_timestamp = True
+		# the oldest frames past the retention bound are dropped by moving this index forward, and the arrays and blocks before it are only compacted once it passes half of the frames
+		self.__first_frame_index = 0
+		self.__payload_bytes_total = 0
+
+		self.__timestamp_parser = DockerLogTimestampParser()
+
+	def __len__(self) -> int:
+		return len(self.__stream_types) - self.__first_frame_index
+
+	def get_maximum_payload_bytes_total(self) -> int:
+		return self.__maximum_payload_bytes_total
+
+	def __drop_oldest_frames(self):
+		# the newest frame is kept even when it alone exceeds the bound
+		frames_total = len(self.__stream_types)
+		while self.__payload_bytes_total > self.__maximum_payload_bytes_total and self.__first_frame_index + 1 < frames_total:
+			self.__payload_bytes_total -= self.__payload_lengths[self.__first_frame_index]
+			self.__first_frame_index += 1
+		if self.__first_frame_index * 2 > frames_total:
+			first_frame_index = self.__first_frame_index
+			first_block_index = self.__block_indexes[first_frame_index]
+			del self.__stream_types[:first_frame_index]
+			del self.__timestamps[:first_frame_index]
+			del self.__payload_start_indexes[:first_frame_index]
+			del self.__payload_lengths[:first_frame_index]
+			self.__block_indexes = array.array("I", (block_index - first_block_index for block_index in self.__block_indexes[first_frame_index:]))
+			del self.__blocks[:first_block_index]
+			self.__first_frame_index = 0
+
+	def append(self, *, stream_type: DockerOutputStreamType, timestamp: float, block: bytes, start_index: int = 0, end_index: int = None):
+		if end_index is None:
+			end_index = len(block)
+		if len(self.__blocks) == 0 or self.__blocks[-1] is not block:
+			self.__blocks.append(block)
+		if len(self.__timestamps) != 0 and timestamp < self.__timestamps[-1]:
+			self.__is_sorted_by_timestamp = False
+		self.__stream_types.append(stream_type)
+		self.__timestamps.append(timestamp)
+		self.__block_indexes.append(len(self.__blocks) - 1)
+		self.__payload_start_indexes.append(start_index)
+		self.__payload_lengths.append(end_index - start_index)
+		self.__payload_bytes_total += end_index - start_index
+		if self.__maximum_payload_bytes_total is not None and self.__payload_bytes_total > self.__maximum_payload_bytes_total:
+			self.__drop_oldest_frames()
+
+	def append_docker_log_content(self, *, content: bytes) -> bytes:
+		# content is the body of a /containers/{id}/logs request made with timestamps, either stream-multiplexed frames (8 byte header of stream type, padding and big-endian payload length) or raw lines for tty containers
+		payloads = []  # type: List[memoryview]
+		content_view = memoryview(content)
+		content_length = len(content)
+		is_multiplexed = content_length >= 8 and content[0] <= DockerOutputStreamType.Stderr and content[1:4] == b"\x00\x00\x00"
+		content_index = 0
+		while content_index < content_length:
+			if is_multiplexed:
+				stream_type, payload_length = struct.unpack_from(">BxxxL", content, content_index)
+				payload_start_index = content_index + 8
+				payload_end_index = payload_start_index + payload_length
+			else:
+				stream_type = DockerOutputStreamType.Stdout
+				payload_start_index = content_index
+				payload_end_index = content.find(b"\n", content_index)
+				if payload_end_index == -1:
+					payload_end_index = content_length
+				else:
+					payload_end_index += 1
+			timestamp_end_index = content.find(b" ", payload_start_index, payload_end_index)
+			if timestamp_end_index == -1:
+				timestamp = time.time()
+				timestamp_end_index = payload_start_index
+			else:
+				timestamp = self.__timestamp_parser.get_timestamp(
+					timestamp_text=content[payload_start_index:timestamp_end_index]
+				)
+				timestamp_end_index += 1
+			self.append(
+				stream_type=stream_type,
+				timestamp=timestamp,
+				block=content,
+				start_index=timestamp_end_index,
+				end_index=payload_end_index
+			)
+			payloads.append(content_view[timestamp_end_index:payload_end_index])
+			content_index = payload_end_index
+		return b"".join(payloads)
+
+	def extend(self, *, output_frame_buffer: DockerOutputFrameBuffer):
+		for frame_index in range(output_frame_buffer.__first_frame_index, len(output_frame_buffer.__stream_types)):
+			payload_start_index = output_frame_buffer.__payload_start_indexes[frame_index]
+			self.append(
+				stream_type=output_frame_buffer.__stream_types[frame_index],
+				timestamp=output_frame_buffer.__timestamps[frame_index],
+				block=output_frame_buffer.__blocks[output_frame_buffer.__block_indexes[frame_index]],
+				start_index=payload_start_index,
+				end_index=payload_start_index + output_frame_buffer.__payload_lengths[frame_index]
+			)
+
+	def get_frames(self, *, stream_type: DockerOutputStreamType = None, start_timestamp: float = None, end_timestamp: float = None) -> Iterator[DockerOutputFrame]:
+
+		if self.__is_sorted_by_timestamp:
+			start_frame_index = self.__first_frame_index if start_timestamp is None else bisect.bisect_left(self.__timestamps, start_timestamp, self.__first_frame_index)
+			end_frame_index = len(self.__timestamps) if end_timestamp is None else bisect.bisect_right(self.__timestamps, end_timestamp, self.__first_frame_index)
+		else:
+			start_frame_index = self.__first_frame_index
+			end_frame_index = len(self.__timestamps)
+
+		for frame_index in range(start_frame_index, end_frame_index):
+			if stream_type is not None and self.__stream_types[frame_index] != stream_type:
+				continue
+			timestamp = self.__timestamps[frame_index]
+			if not self.__is_sorted_by_timestamp:
+				if start_timestamp is not None and timestamp < start_timestamp:
+					continue
+				if end_timestamp is not None and timestamp > end_timestamp:
+					continue
+			payload_start_index = self.__payload_start_indexes[frame_index]
+			yield DockerOutputFrame(
+				stream_type=DockerOutputStreamType(self.__stream_types[frame_index]),
+				timestamp=timestamp,
+				payload=memoryview(self.__blocks[self.__block_indexes[frame_index]])[payload_start_index:payload_start_index + self.__payload_lengths[frame_index]]
+			)
+
+
+class DockerContainerResourceLimits():
+
+	def __init__(self, *, cpuset_cpus: str = None, cpu_period: int = None, cpu_quota: int = None, memory_limit_bytes: int = None, pids_limit: int = None):
+
+		self.__cpuset_cpus = cpuset_cpus
+		self.__cpu_period = cpu_period
+		self.__cpu_quota = cpu_quota
+		self.__memory_limit_bytes = memory_limit_bytes
+		self.__pids_limit = pids_limit
+
+	def get_cpuset_cpus(self) -> str:
+		return self.__cpuset_cpus
+
+	def get_cpu_period(self) -> int:
+		return self.__cpu_period
+
+	def get_cpu_quota(self) -> int:
+		return self.__cpu_quota
+
+	def get_memory_limit_bytes(self) -> int:
+		return self.__memory_limit_bytes
+
+	def get_pids_limit(self) -> int:
+		return self.__pids_limit
+
+	def get_copy(self, *, cpuset_cpus: str) -> DockerContainerResourceLimits:
+		return DockerContainerResourceLimits(
+			cpuset_cpus=cpuset_cpus,
+			cpu_period=self.__cpu_period,
+			cpu_quota=self.__cpu_quota,
+			memory_limit_bytes=self.__memory_limit_bytes,
+			pids_limit=self.__pids_limit
+		)
+
+	def get_container_kwargs(self) -> Dict:
+		container_kwargs = {}
+		if self.__cpuset_cpus is not None:
+			container_kwargs["cpuset_cpus"] = self.__cpuset_cpus
+		if self.__cpu_period is not None:
+			container_kwargs["cpu_period"] = self.__cpu_period
+		if self.__cpu_quota is not None:
+			container_kwargs["cpu_quota"] = self.__cpu_quota
+		if self.__memory_limit_bytes is not None:
+			container_kwargs["mem_limit"] = self.__memory_limit_bytes
+		if self.__pids_limit is not None:
+			container_kwargs["pids_limit"] = self.__pids_limit
+		return container_kwargs
+
+
+class DockerCpusetReservation():
+
+	def __init__(self, *, cpuset_scheduler: DockerCpusetScheduler, cpu_indexes: List[int]):
+
+		self.__cpuset_scheduler = cpuset_scheduler
+		self.__cpu_indexes = cpu_indexes
+
+		self.__is_released = False
+
+	def get_cpu_indexes(self) -> List[int]:
+		return self.__cpu_indexes
+
+	def get_cpuset_cpus(self) -> str:
+		return ",".join(str(cpu_index) for cpu_index in self.__cpu_indexes)
+
+	def release(self):
+		if not self.__is_released:
+			self.__is_released = True
+			self.__cpuset_scheduler.release(
+				cpu_indexes=self.__cpu_indexes
+			)
+
+
+class DockerCpusetScheduler():
+
+	def __init__(self, *, cpu_indexes: List[int] = None):
+
+		if cpu_indexes is None:
+			if hasattr(os, "sched_getaffinity"):
+				cpu_indexes = sorted(os.sched_getaffinity(0))
+			else:
+				cpu_indexes = list(range(os.cpu_count()))
+
+		self.__cpu_indexes = sorted(cpu_indexes)
+
+		self.__available_cpu_indexes = set(self.__cpu_indexes)
+		self.__available_cpu_indexes_condition = threading.Condition()
+
+	def get_cpu_indexes(self) -> List[int]:
+		return list(self.__cpu_indexes)
+
+	def get_available_cpu_indexes(self) -> List[int]:
+		with self.__available_cpu_indexes_condition:
+			return sorted(self.__available_cpu_indexes)
+
+	def __get_placement(self, *, cpus_total: int) -> List[int]:
+		# prefer the smallest run of adjacent available cpus that fits so that containers stay on neighbouring cores and large runs remain for large requests
+		runs = []  # type: List[List[int]]
+		for cpu_index in self.__cpu_indexes:
+			if cpu_index in self.__available_cpu_indexes:
+				if len(runs) != 0 and runs[-1][-1] == cpu_index - 1:
+					runs[-1].append(cpu_index)
+				else:
+					runs.append([cpu_index])
+		fitting_runs = [run for run in runs if len(run) >= cpus_total]
+		if len(fitting_runs) != 0:
+			return min(fitting_runs, key=len)[:cpus_total]
+		if len(self.__available_cpu_indexes) >= cpus_total:
+			return sorted(self.__available_cpu_indexes)[:cpus_total]
+		return None
+
+	def reserve(self, *, cpus_total: int, timeout_seconds: float = 0) -> DockerCpusetReservation:
+		if cpus_total < 1 or cpus_total > len(self.__cpu_indexes):
+			raise DockerCpusetUnavailableException(f"Cannot reserve {cpus_total} cpus out of {len(self.__cpu_indexes)}.")
+		with self.__available_cpu_indexes_condition:
+			placement = None  # type: List[int]
+
+			def is_placed() -> bool:
+				nonlocal placement
+				placement = self.__get_placement(
+					cpus_total=cpus_total
+				)
+				return placement is not None
+
+			if not self.__available_cpu_indexes_condition.wait_for(is_placed, timeout=timeout_seconds):
+				raise DockerCpusetUnavailableException(f"Failed to reserve {cpus_total} cpus within {timeout_seconds} seconds.")
+			self.__available_cpu_indexes.difference_update(placement)
+		return DockerCpusetReservation(
+			cpuset_scheduler=self,
+			cpu_indexes=placement
+		)
+
+	def release(self, *, cpu_indexes: List[int]):
+		with self.__available_cpu_indexes_condition:
+			self.__available_cpu_indexes.update(cpu_indexes)
+			self.__available_cpu_indexes_condition.notify_all()
+
+
+class DockerStartPriority(IntEnum):
+	High = 0
+	Normal = 1
+	Low = 2
+
+
+class DockerPrioritySemaphore():
+
+	def __init__(self, *, permits_total: int):
+
+		self.__available_permits_total = permits_total
+
+		# waiters ordered by priority and then arrival so that equal priorities stay first come, first served
+		self.__waiters = []  # type: List[Tuple[int, int]]
+		self.__waiter_sequence = itertools.count()
+		self.__condition = threading.Condition()
+
+	def acquire(self, *, priority: int, timeout_seconds: float = None) -> bool:
+		with self.__condition:
+			waiter = (priority, next(self.__waiter_sequence))
+			heapq.heappush(self.__waiters, waiter)
+			is_acquired = self.__condition.wait_for(lambda: self.__available_permits_total > 0 and self.__waiters[0] == waiter, timeout=timeout_seconds)
+			if is_acquired:
+				heapq.heappop(self.__waiters)
+				self.__available_permits_total -= 1
+			else:
+				self.__waiters.remove(waiter)
+				heapq.heapify(self.__waiters)
+			self.__condition.notify_all()
+			return is_acquired
+
+	def release(self):
+		with self.__condition:
+			self.__available_permits_total += 1
+			self.__condition.notify_all()
+
+	def get_waiting_total(self) -> int:
+		with self.__condition:
+			return len(self.__waiters)
+
+
+class DockerStartSchedulerMetrics(NamedTuple):
+	builds_waiting_total: int
+	builds_running_total: int
+	builds_shared_total: int
+	starts_waiting_total: int
+	starts_running_total: int
+	rejected_total: int
+
+
+class DockerStartScheduler():
+
+	def __init__(self, *, maximum_concurrent_builds_total: int, maximum_concurrent_starts_total: int, maximum_queue_depth: int = None, queue_timeout_seconds: float = None):
+
+		self.__maximum_queue_depth = maximum_queue_depth
+		self.__queue_timeout_seconds = queue_timeout_seconds
+
+		self.__build_semaphore = DockerPrioritySemaphore(
+			permits_total=maximum_concurrent_builds_total
+		)
+		self.__start_semaphore = DockerPrioritySemaphore(
+			permits_total=maximum_concurrent_starts_total
+		)
+
+		self.__build_future_per_build_key = {}  # type: Dict[str, Future]
+		self.__builds_running_total = 0
+		self.__builds_shared_total = 0
+		self.__starts_running_total = 0
+		self.__rejected_total = 0
+		self.__lock = threading.Lock()
+
+	def __acquire(self, *, semaphore: DockerPrioritySemaphore, priority: DockerStartPriority):
+		# shedding load at the door keeps the latency of admitted work bounded instead of letting every queued start slow down together
+		if self.__maximum_queue_depth is not None and semaphore.get_waiting_total() >= self.__maximum_queue_depth:
+			with self.__lock:
+				self.__rejected_total += 1
+			raise DockerStartSchedulerQueueFullException(f"Queue depth reached maximum of {self.__maximum_queue_depth}.")
+		if not semaphore.acquire(
+			priority=priority,
+			timeout_seconds=self.__queue_timeout_seconds
+		):
+			with self.__lock:
+				self.__rejected_total += 1
+			raise DockerStartSchedulerTimeoutException(f"Failed to be scheduled within {self.__queue_timeout_seconds} seconds.")
+
+	def build(self, *, build_key: str, priority: DockerStartPriority, build_function: Callable[[], T]) -> T:
+		# callers building the same key while a build is in flight wait on it and share its result
+		with self.__lock:
+			build_future = self.__build_future_per_build_key.get(build_key)
+			is_building = build_future is None
+			if is_building:
+				from concurrent.futures import Future
+				build_future = Future()
+				self.__build_future_per_build_key[build_key] = build_future
+			else:
+				self.__builds_shared_total += 1
+		if is_building:
+			try:
+				self.__acquire(
+					semaphore=self.__build_semaphore,
+					priority=priority
+				)
+				try:
+					with self.__lock:
+						self.__builds_running_total += 1
+					build_future.set_result(build_function())
+				finally:
+					with self.__lock:
+						self.__builds_running_total -= 1
+					self.__build_semaphore.release()
+			except Exception as ex:
+				build_future.set_exception(ex)
+			finally:
+				with self.__lock:
+					del self.__build_future_per_build_key[build_key]
+		return build_future.result()
+
+	def start(self, *, priority: DockerStartPriority, start_function: Callable[[], T]) -> T:
+		# the permit covers creating and starting the container, not its lifetime, so this bounds the load placed on the daemon rather than how many containers are running
+		self.__acquire(
+			semaphore=self.__start_semaphore,
+			priority=priority
+		)
+		try:
+			with self.__lock:
+				self.__starts_running_total += 1
+			return start_function()
+		finally:
+			with self.__lock:
+				self.__starts_running_total -= 1
+			self.__start_semaphore.release()
+
+	def get_metrics(self) -> DockerStartSchedulerMetrics:
+		with self.__lock:
+			return DockerStartSchedulerMetrics(
+				builds_waiting_total=self.__build_semaphore.get_waiting_total(),
+				builds_running_total=self.__builds_running_total,
+				builds_shared_total=self.__builds_shared_total,
+				starts_waiting_total=self.__start_semaphore.get_waiting_total(),
+				starts_running_total=self.__starts_running_total,
+				rejected_total=self.__rejected_total
+			)
+
+
+class DockerCommandResult(NamedTuple):
+	output: bytes
+	exit_code: int
+	is_cached: bool
+
+
+class DockerCommandResultCache():
+
+	def __init__(self, *, directory_path: str, maximum_size_bytes: int):
+
+		self.__directory_path = directory_path
+		self.__maximum_size_bytes = maximum_size_bytes
+
+		os.makedirs(directory_path, exist_ok=True)
+
+		self.__size_bytes = 0
+		for directory_entry in os.scandir(directory_path):
+			if directory_entry.name.endswith(".result"):
+				self.__size_bytes += directory_entry.stat().st_size
+		self.__lock = threading.Lock()
+
+	@staticmethod
+	def get_key(*, image_id: str, state_hash: str, command: str) -> str:
+		import hashlib
+		key_hash = hashlib.sha256()
+		for key_part in (image_id, state_hash, command):
+			key_part_bytes = key_part.encode()
+			key_hash.update(struct.pack(">Q", len(key_part_bytes)))
+			key_hash.update(key_part_bytes)
+		return key_hash.hexdigest()
+
+	def __get_file_path(self, *, key: str) -> str:
+		return os.path.join(self.__directory_path, f"{key}.result")
+
+	def get(self, *, key: str) -> Tuple[int, DockerOutputFrameBuffer]:
+		file_path = self.__get_file_path(
+			key=key
+		)
+		try:
+			with open(file_path, "rb") as file_handle:
+				content = file_handle.read()
+			# the modification time is the recency used for least recently used eviction
+			os.utime(file_path)
+		except FileNotFoundError:
+			return None
+		header_length = content.index(b"\n")
+		header = json.loads(content[:header_length])
+		output_frame_buffer = DockerOutputFrameBuffer()
+		payload_start_index = header_length + 1
+		timestamp = time.time()
+		for stream_type, payload_length in header["frames"]:
+			output_frame_buffer.append(
+				stream_type=DockerOutputStreamType(stream_type),
+				timestamp=timestamp,
+				block=content,
+				start_index=payload_start_index,
+				end_index=payload_start_index + payload_length
+			)
+			payload_start_index += payload_length
+		return header["exit_code"], output_frame_buffer
+
+	def set(self, *, key: str, exit_code: int, output_frame_buffer: DockerOutputFrameBuffer):
+		output_frames = list(output_frame_buffer.get_frames())
+		header = {
+			"exit_code": exit_code,
+			"frames": [[int(output_frame.stream_type), output_frame.payload.nbytes] for output_frame in output_frames]
+		}
+		file_path = self.__get_file_path(
+			key=key
+		)
+		import uuid
+		temp_file_path = f"{file_path}.{uuid.uuid4()}.tmp"
+		with open(temp_file_path, "wb") as file_handle:
+			file_handle.write(json.dumps(header).encode())
+			file_handle.write(b"\n")
+			for output_frame in output_frames:
+				file_handle.write(output_frame.payload)
+			file_size_bytes = file_handle.tell()
+		with self.__lock:
+			try:
+				self.__size_bytes -= os.stat(file_path).st_size
+			except FileNotFoundError:
+				pass
+			os.replace(temp_file_path, file_path)
+			self.__size_bytes += file_size_bytes
+			if self.__size_bytes > self.__maximum_size_bytes:
+				self.__evict()
+
+	def __evict(self):
+		directory_entries = []
+		for directory_entry in os.scandir(self.__directory_path):
+			if directory_entry.name.endswith(".result"):
+				directory_entries.append((directory_entry.stat().st_mtime, directory_entry.stat().st_size, directory_entry.path))
+		directory_entries.sort()
+		for _, file_size_bytes, file_path in directory_entries:
+			if self.__size_bytes <= self.__maximum_size_bytes:
+				break
+			try:
+				os.unlink(file_path)
+				self.__size_bytes -= file_size_bytes
+			except FileNotFoundError:
+				pass
+
+	def get_size_bytes(self) -> int:
+		with self.__lock:
+			return self.__size_bytes
+
+
+class DockerCacheVolume():
+
+	def __init__(self, *, name: str, container_directory_path: str, environment: Dict[str, str] = None, build_arguments: Dict[str, str] = None, maximum_size_bytes: int = None):
+
+		self.__name = name
+		self.__container_directory_path = container_directory_path
+		self.__environment = environment
+		# builds cannot mount the volume, so they only receive settings that still help without it, such as the package index to use
+		self.__build_arguments = build_arguments
+		# docker can only size and remove whole volumes, so a cache over this budget is dropped entirely rather than trimmed
+		self.__maximum_size_bytes = maximum_size_bytes
+
+	def get_name(self) -> str:
+		return self.__name
+
+	def get_container_directory_path(self) -> str:
+		return self.__container_directory_path
+
+	def get_environment(self) -> Dict[str, str]:
+		return {} if self.__environment is None else dict(self.__environment)
+
+	def get_build_arguments(self) -> Dict[str, str]:
+		return {} if self.__build_arguments is None else dict(self.__build_arguments)
+
+	def get_maximum_size_bytes(self) -> int:
+		return self.__maximum_size_bytes
+
+	@staticmethod
+	def get_pip_cache_volume(*, name: str = "docker_manager_pip_cache", maximum_size_bytes: int = None, index_url: str = None) -> DockerCacheVolume:
+		container_directory_path = "/root/.cache/pip"
+		build_arguments = {}  # type: Dict[str, str]
+		if index_url is not None:
+			# a local index or caching proxy also serves the installs of Dockerfiles that declare these as ARG
+			build_arguments["PIP_INDEX_URL"] = index_url
+			if index_url.startswith("http://"):
+				build_arguments["PIP_TRUSTED_HOST"] = index_url.split("://", 1)[1].split("/", 1)[0].split(":", 1)[0]
+		return DockerCacheVolume(
+			name=name,
+			container_directory_path=container_directory_path,
+			environment={
+				"PIP_CACHE_DIR": container_directory_path,
+				**build_arguments
+			},
+			build_arguments=build_arguments,
+			maximum_size_bytes=maximum_size_bytes
+		)
+
+	@staticmethod
+	def get_apt_cache_volume(*, name: str = "docker_manager_apt_cache", maximum_size_bytes: int = None) -> DockerCacheVolume:
+		return DockerCacheVolume(
+			name=name,
+			container_directory_path="/var/cache/apt/archives",
+			maximum_size_bytes=maximum_size_bytes
+		)
+
+
+class DockerCoordinatorSlot():
+
+	def __init__(self, *, file_handle: io.IOBase, retries_total: int = 0):
+
+		self.__file_handle = file_handle
+		self.__retries_total = retries_total
+
+	def get_retries_total(self) -> int:
+		return self.__retries_total
+
+	def release(self):
+		# closing the file releases its flock, and releasing twice is harmless
+		if self.__file_handle is not None:
+			self.__file_handle.close()
+			self.__file_handle = None
+
+	def __enter__(self) -> DockerCoordinatorSlot:
+		return self
+
+	def __exit__(self, exception_type, exception, traceback) -> bool:
+		self.release()
+		return False
+
+
+class DockerCoordinator():
+
+	# a manager started inside a container that shares its parent's daemon socket finds the parent's coordination directory through these
+	directory_path_environment_variable_name = "DOCKER_MANAGER_COORDINATION_DIRECTORY_PATH"
+	host_directory_path_environment_variable_name = "DOCKER_MANAGER_COORDINATION_HOST_DIRECTORY_PATH"
+	api_version_environment_variable_name = "DOCKER_MANAGER_DOCKER_API_VERSION"
+	container_directory_path = "/var/run/docker_manager"
+	build_cache_repository = "docker_manager_build_cache"
+
+	def __init__(self, *, directory_path: str, host_directory_path: str = None, maximum_concurrent_operations_total: int = None, api_version: str = None):
+
+		self.__directory_path = directory_path
+		# the daemon resolves bind mounts on its own host, so nested containers mount the directory by its host path rather than by the path it has in the current container
+		self.__host_directory_path = os.path.realpath(directory_path) if host_directory_path is None else host_directory_path
+		self.__api_version = api_version
+
+		os.makedirs(directory_path, exist_ok=True)
+		settings_file_path = os.path.join(directory_path, "settings.json")
+		if maximum_concurrent_operations_total is not None:
+			temp_file_path = f"{settings_file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+			with open(temp_file_path, "w") as settings_file_handle:
+				json.dump({
+					"maximum_concurrent_operations_total": maximum_concurrent_operations_total
+				}, settings_file_handle)
+			os.replace(temp_file_path, settings_file_path)
+		else:
+			with open(settings_file_path, "r") as settings_file_handle:
+				maximum_concurrent_operations_total = json.load(settings_file_handle)["maximum_concurrent_operations_total"]
+		self.__maximum_concurrent_operations_total = maximum_concurrent_operations_total
+
+	@staticmethod
+	def get_from_environment() -> DockerCoordinator:
+		directory_path = os.environ.get(DockerCoordinator.directory_path_environment_variable_name)
+		if directory_path is None or not os.path.isdir(directory_path):
+			return None
+		return DockerCoordinator(
+			directory_path=directory_path,
+			host_directory_path=os.environ.get(DockerCoordinator.host_directory_path_environment_variable_name),
+			api_version=os.environ.get(DockerCoordinator.api_version_environment_variable_name)
+		)
+
+	def get_directory_path(self) -> str:
+		return self.__directory_path
+
+	def get_host_directory_path(self) -> str:
+		return self.__host_directory_path
+
+	def get_maximum_concurrent_operations_total(self) -> int:
+		return self.__maximum_concurrent_operations_total
+
+	def get_api_version(self) -> str:
+		return self.__api_version
+
+	def set_api_version(self, *, api_version: str):
+		self.__api_version = api_version
+
+	def get_container_volumes(self) -> List[str]:
+		return [f"{self.__host_directory_path}:{DockerCoordinator.container_directory_path}"]
+
+	def get_container_environment(self) -> Dict[str, str]:
+		environment = {
+			DockerCoordinator.directory_path_environment_variable_name: DockerCoordinator.container_directory_path,
+			DockerCoordinator.host_directory_path_environment_variable_name: self.__host_directory_path
+		}
+		if self.__api_version is not None:
+			# children reuse the negotiated version rather than asking the shared daemon again
+			environment[DockerCoordinator.api_version_environment_variable_name] = self.__api_version
+		return environment
+
+	def __open_lock_file(self, *, file_name: str) -> io.IOBase:
+		return open(os.path.join(self.__directory_path, file_name), "a+")
+
+	def acquire_slot(self, *, timeout_seconds: float = None) -> DockerCoordinatorSlot:
+		# flock is held by the kernel for the whole tree of processes sharing the directory, and is released even when a holder crashes
+		import fcntl
+		deadline = None if timeout_seconds is None else time.monotonic() + timeout_seconds
+		delay_seconds = 0.01
+		retries_total = 0
+		while True:
+			for slot_index in range(self.__maximum_concurrent_operations_total):
+				file_handle = self.__open_lock_file(
+					file_name=f"slot_{slot_index}.lock"
+				)
+				try:
+					fcntl.flock(file_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+				except BlockingIOError:
+					file_handle.close()
+				else:
+					return DockerCoordinatorSlot(
+						file_handle=file_handle,
+						retries_total=retries_total
+					)
+			if deadline is not None:
+				remaining_seconds = deadline - time.monotonic()
+				if remaining_seconds <= 0:
+					raise DockerCoordinatorTimeoutException(f"Failed to acquire one of {self.__maximum_concurrent_operations_total} coordination slots within {timeout_seconds} seconds.")
+				delay_seconds = min(delay_seconds, remaining_seconds)
+			time.sleep(delay_seconds)
+			delay_seconds = min(delay_seconds * 2, 0.5)
+			retries_total += 1
+
+	@staticmethod
+	def get_build_key(*, dockerfile_directory_path: str, build_arguments: Dict[str, str]) -> str:
+		# the build context is hashed by content so that managers seeing the same Dockerfile under different paths, such as inside nested containers, share one image
+		import hashlib
+		build_hash = hashlib.sha256()
+		for directory_path, directory_names, file_names in os.walk(dockerfile_directory_path):
+			directory_names.sort()
+			for file_name in sorted(file_names):
+				file_path = os.path.join(directory_path, file_name)
+				relative_file_path = os.path.relpath(file_path, dockerfile_directory_path).replace(os.sep, "/").encode()
+				build_hash.update(struct.pack(">Q", len(relative_file_path)) + relative_file_path)
+				build_hash.update(struct.pack(">Q", os.stat(file_path).st_mode & 0o111))
+				with open(file_path, "rb") as file_handle:
+					for chunk in iter(lambda: file_handle.read(1024 * 1024), b""):
+						build_hash.update(chunk)
+		build_arguments_bytes = json.dumps(build_arguments, sort_keys=True).encode()
+		build_hash.update(struct.pack(">Q", len(build_arguments_bytes)) + build_arguments_bytes)
+		return build_hash.hexdigest()
+
+	def __get_inventory(self) -> Dict[str, Dict]:
+		try:
+			with open(os.path.join(self.__directory_path, "inventory.json"), "r") as inventory_file_handle:
+				return json.load(inventory_file_handle)
+		except FileNotFoundError:
+			return {}
+
+	def get_inventory(self) -> Dict[str, Dict]:
+		return self.__get_inventory()
+
+	def get_image_id(self, *, build_key: str, build_function: Callable[[], str], api_client: APIClient) -> str:
+		import fcntl
+		import docker.errors
+		cache_tag = build_key[:32]
+		cache_image_name = f"{DockerCoordinator.build_cache_repository}:{cache_tag}"
+		# only one manager in the tree builds a given context while the others wait for its result
+		with self.__open_lock_file(
+			file_name=f"build_{cache_tag}.lock"
+		) as build_lock_file_handle:
+			fcntl.flock(build_lock_file_handle, fcntl.LOCK_EX)
+			if build_key in self.__get_inventory():
+				try:
+					return api_client.inspect_image(cache_image_name)["Id"]
+				except docker.errors.ImageNotFound:
+					# removed outside of the tree since it was recorded
+					pass
+			with self.acquire_slot():
+				image_id = build_function()
+			# the cache tag keeps the image alive after the tag it was built under is removed with its container
+			api_client.tag(image_id, DockerCoordinator.build_cache_repository, cache_tag)
+			with self.__open_lock_file(
+				file_name="inventory.lock"
+			) as inventory_lock_file_handle:
+				fcntl.flock(inventory_lock_file_handle, fcntl.LOCK_EX)
+				inventory = self.__get_inventory()
+				inventory[build_key] = {
+					"image_id": image_id,
+					"image_name": cache_image_name,
+					"built_timestamp": time.time()
+				}
+				inventory_file_path = os.path.join(self.__directory_path, "inventory.json")
+				temp_file_path = f"{inventory_file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+				with open(temp_file_path, "w") as inventory_file_handle:
+					json.dump(inventory, inventory_file_handle)
+				os.replace(temp_file_path, inventory_file_path)
+			return image_id
+
+
+class DockerReadinessProbe(abc.ABC):
+
+	def __init__(self, *, initial_delay_seconds: float = 0.05, maximum_delay_seconds: float = 1.0):
+
+		self.__initial_delay_seconds = initial_delay_seconds
+		self.__maximum_delay_seconds = maximum_delay_seconds
+
+	@abc.abstractmethod
+	def is_ready(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		raise NotImplementedError()
+
+	def wait(self, *, docker_container_instance: DockerContainerInstance, timeout_seconds: float) -> bool:
+		# probes that cannot be driven by an event are polled, starting quickly since most containers become ready within moments and backing off so that slow ones are not hammered
+		deadline = time.monotonic() + timeout_seconds
+		delay_seconds = self.__initial_delay_seconds
+		attempts_total = 0
+		while True:
+			attempts_total += 1
+			docker_container_instance.get_tracer().get_current_span().set_attribute(
+				key="ready.attempts",
+				value=attempts_total
+			)
+			if self.is_ready(
+				docker_container_instance=docker_container_instance
+			):
+				return True
+			if not docker_container_instance.get_attrs()["State"]["Running"]:
+				# a container that exited is never going to become ready
+				return False
+			remaining_seconds = deadline - time.monotonic()
+			if remaining_seconds <= 0:
+				return False
+			time.sleep(min(delay_seconds, remaining_seconds))
+			delay_seconds = min(delay_seconds * 2, self.__maximum_delay_seconds)
+
+
+class DockerExecReadinessProbe(DockerReadinessProbe):
+
+	def __init__(self, *, command: str, initial_delay_seconds: float = 0.05, maximum_delay_seconds: float = 1.0):
+		super().__init__(
+			initial_delay_seconds=initial_delay_seconds,
+			maximum_delay_seconds=maximum_delay_seconds
+		)
+
+		self.__command = command
+
+	def is_ready(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		# runs outside of execute_command so that probing neither appears in the output nor changes the state hash
+		from docker.errors import APIError
+		api_client = docker_container_instance.get_docker_client().api
+		try:
+			exec_id = api_client.exec_create(docker_container_instance.get_container_id(), self.__command, stdout=False, stderr=False)["Id"]
+			api_client.exec_start(exec_id)
+			return api_client.exec_inspect(exec_id)["ExitCode"] == 0
+		except APIError:
+			return False
+
+
+class DockerTcpReadinessProbe(DockerReadinessProbe):
+
+	def __init__(self, *, container_port: int, connect_timeout_seconds: float = 1.0, initial_delay_seconds: float = 0.05, maximum_delay_seconds: float = 1.0):
+		super().__init__(
+			initial_delay_seconds=initial_delay_seconds,
+			maximum_delay_seconds=maximum_delay_seconds
+		)
+
+		self.__container_port = container_port
+		self.__connect_timeout_seconds = connect_timeout_seconds
+
+	def is_ready(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		network_settings = docker_container_instance.get_attrs()["NetworkSettings"]
+		# the container address is preferred since a published port is accepted by the userland proxy whether or not anything listens behind it
+		host = network_settings.get("IPAddress")
+		if not host:
+			for network in (network_settings.get("Networks") or {}).values():
+				if network.get("IPAddress"):
+					host = network["IPAddress"]
+					break
+		port = self.__container_port
+		if not host:
+			port_bindings = (network_settings.get("Ports") or {}).get(f"{self.__container_port}/tcp")
+			if not port_bindings:
+				return False
+			host = port_bindings[0]["HostIp"]
+			if host in ["", "0.0.0.0", "::"]:
+				host = "127.0.0.1"
+			port = int(port_bindings[0]["HostPort"])
+		try:
+			with socket.create_connection((host, port), timeout=self.__connect_timeout_seconds):
+				return True
+		except OSError:
+			return False
+
+
+class DockerLogPatternReadinessProbe(DockerReadinessProbe):
+
+	def __init__(self, *, pattern: bytes, search_window_bytes: int = 64 * 1024):
+		super().__init__()
+
+		self.__pattern = re.compile(pattern)
+		# a match may span frames, so recent output is searched together
+		self.__search_window_bytes = search_window_bytes
+
+	def is_ready(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		for output_frame in docker_container_instance.get_output_frames():
+			if self.__pattern.search(output_frame.payload):
+				return True
+		return False
+
+	def wait(self, *, docker_container_instance: DockerContainerInstance, timeout_seconds: float) -> bool:
+		# follows the log stream, which includes everything written so far, so the pattern is found as soon as it is written
+		import requests.exceptions
+		deadline = time.monotonic() + timeout_seconds
+		api_client = docker_container_instance.get_docker_client().api
+		container_id = docker_container_instance.get_container_id()
+		response = api_client._get(
+			api_client._url("/containers/{0}/logs", container_id),
+			params={
+				"stdout": 1,
+				"stderr": 1,
+				"follow": 1
+			},
+			stream=True,
+			timeout=max(timeout_seconds, 0.001)
+		)
+		api_client._raise_for_status(response)
+		log_stream_parser = DockerLogStreamParser(
+			is_tty=docker_container_instance.get_attrs()["Config"]["Tty"]
+		)
+		recent_output = b""
+		try:
+			for chunk in response.iter_content(chunk_size=None):
+				for _, payload in log_stream_parser.append(
+					chunk=chunk
+				):
+					recent_output = (recent_output + payload)[-self.__search_window_bytes:]
+					if self.__pattern.search(recent_output):
+						return True
+				if time.monotonic() >= deadline:
+					return False
+		except requests.exceptions.RequestException:
+			# the read timed out without any further output before the deadline
+			return False
+		finally:
+			response.close()
+		# the stream ends when the container exits
+		return False
+
+
+class DockerHealthcheckReadinessProbe(DockerReadinessProbe):
+
+	def __init__(self):
+		super().__init__()
+
+	def __get_health_status(self, *, docker_container_instance: DockerContainerInstance) -> str:
+		health = docker_container_instance.get_attrs()["State"].get("Health")
+		if health is None:
+			raise Exception(f"Container does not define a HEALTHCHECK.")
+		return health["Status"]
+
+	def is_ready(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		return self.__get_health_status(
+			docker_container_instance=docker_container_instance
+		) == "healthy"
+
+	def wait(self, *, docker_container_instance: DockerContainerInstance, timeout_seconds: float) -> bool:
+		# waits on the daemon's health_status events rather than polling the health check results, with until ending the event stream at the deadline
+		since = int(time.time())
+		if self.is_ready(
+			docker_container_instance=docker_container_instance
+		):
+			return True
+		events = docker_container_instance.get_docker_client().api.events(
+			since=since,
+			until=since + int(timeout_seconds) + 1,
+			filters={
+				"type": "container",
+				"container": docker_container_instance.get_container_id(),
+				"event": ["health_status", "die"]
+			},
+			decode=True
+		)
+		try:
+			for event in events:
+				action = event.get("Action") or event.get("status") or ""
+				if action == "die":
+					return False
+				if action == "health_status: healthy":
+					return True
+		finally:
+			events.close()
+		return False
+
+
+class DockerContainerStatus(IntEnum):
+	Created = 0
+	Running = 1
+	Exited = 2
+	Removed = 3
+
+
+class DockerContainerTable():
+
+	def __init__(self):
+
+		# per-container bookkeeping lives in parallel arrays indexed by row so that tracking thousands of containers costs a few bytes each
+		self.__logs_sent_lengths = array.array("Q")
+		self.__statuses = array.array("B")
+		self.__is_duplicates = array.array("B")
+		self.__reuses_totals = array.array("I")
+		self.__free_row_indexes = []  # type: List[int]
+		self.__lock = threading.Lock()
+
+	def add_row(self, *, status: DockerContainerStatus) -> int:
+		with self.__lock:
+			if len(self.__free_row_indexes) != 0:
+				row_index = self.__free_row_indexes.pop()
+				self.__logs_sent_lengths[row_index] = 0
+				self.__statuses[row_index] = status
+				self.__is_duplicates[row_index] = 0
+				self.__reuses_totals[row_index] = 0
+			else:
+				row_index = len(self.__statuses)
+				self.__logs_sent_lengths.append(0)
+				self.__statuses.append(status)
+				self.__is_duplicates.append(0)
+				self.__reuses_totals.append(0)
+			return row_index
+
+	def remove_row(self, *, row_index: int):
+		with self.__lock:
+			self.__statuses[row_index] = DockerContainerStatus.Removed
+			self.__free_row_indexes.append(row_index)
+
+	def get_rows_total(self) -> int:
+		with self.__lock:
+			return len(self.__statuses) - len(self.__free_row_indexes)
+
+	def get_status_totals(self) -> Dict[DockerContainerStatus, int]:
+		with self.__lock:
+			status_totals = {status: 0 for status in DockerContainerStatus}
+			for status in self.__statuses:
+				status_totals[DockerContainerStatus(status)] += 1
+			status_totals[DockerContainerStatus.Removed] -= len(self.__free_row_indexes)
+			return status_totals
+
+	def get_logs_sent_length(self, *, row_index: int) -> int:
+		return self.__logs_sent_lengths[row_index]
+
+	def set_logs_sent_length(self, *, row_index: int, logs_sent_length: int):
+		self.__logs_sent_lengths[row_index] = logs_sent_length
+
+	def get_status(self, *, row_index: int) -> DockerContainerStatus:
+		return DockerContainerStatus(self.__statuses[row_index])
+
+	def set_status(self, *, row_index: int, status: DockerContainerStatus):
+		self.__statuses[row_index] = status
+
+	def is_duplicate(self, *, row_index: int) -> bool:
+		return self.__is_duplicates[row_index] == 1
+
+	def set_is_duplicate(self, *, row_index: int, is_duplicate: bool):
+		self.__is_duplicates[row_index] = 1 if is_duplicate else 0
+
+	def get_reuses_total(self, *, row_index: int) -> int:
+		return self.__reuses_totals[row_index]
+
+	def set_reuses_total(self, *, row_index: int, reuses_total: int):
+		self.__reuses_totals[row_index] = reuses_total
+
+
+class DockerContainerInstance():
+
+	# a handle is only the container id plus references shared with its manager, since thousands of them may be tracked at once; inspect attributes are fetched on demand and bookkeeping lives in the manager's DockerContainerTable
+	__slots__ = (
+		"__name",
+		"__docker_client",
+		"__docker_container_id",
+		"__image_id",
+		"__is_docker_socket_needed",
+		"__resource_limits",
+		"__cpuset_reservation",
+		"__cache_volumes",
+		"__command_result_cache",
+		"__labels",
+		"__coordinator",
+		"__tracer",
+		"__docker_container_table",
+		"__row_index",
+		"__stdout",
+		"__output_frame_buffer",
+		"__maximum_output_bytes_total",
+		"__state_hash",
+		"__weakref__"
+	)
+
+	def __init__(self, *, name: str, docker_client: DockerClient, docker_container_id: str, image_id: str, is_docker_socket_needed: bool, resource_limits: DockerContainerResourceLimits = None, cpuset_reservation: DockerCpusetReservation = None, cache_volumes: List[DockerCacheVolume] = None, command_result_cache: DockerCommandResultCache = None, labels: Dict[str, str] = None, coordinator: DockerCoordinator = None, tracer: DockerTracer = None, docker_container_table: DockerContainerTable = None, status: DockerContainerStatus = DockerContainerStatus.Running, maximum_output_bytes_total: int = None):
+
+		self.__name = name
+		self.__docker_client = docker_client
+		self.__docker_container_id = docker_container_id
+		# the image the container was originally created from, which stays the clean state to reset to even after execute_command takes over a duplicate
+		self.__image_id = image_id
+		self.__is_docker_socket_needed = is_docker_socket_needed
+		self.__resource_limits = resource_limits
+		self.__cpuset_reservation = cpuset_reservation
+		self.__cache_volumes = cache_volumes
+		self.__command_result_cache = command_result_cache
+		self.__labels = labels
+		self.__coordinator = coordinator
+		self.__tracer = DockerTracer() if tracer is None else tracer
+		self.__docker_container_table = DockerContainerTable() if docker_container_table is None else docker_container_table
+
+		self.__row_index = self.__docker_container_table.add_row(
+			status=status
+		)
+		self.__stdout = None
+		self.__output_frame_buffer = None  # type: DockerOutputFrameBuffer
+		# the log slices and exec output kept for get_output_frames, beyond which the oldest frames are dropped
+		self.__maximum_output_bytes_total = maximum_output_bytes_total
+		# chains the files copied in and commands executed since the container was created from the image
+		self.__state_hash = ""
+
+	def __del__(self):
+		try:
+			if self.__row_index is not None:
+				self.__docker_container_table.remove_row(
+					row_index=self.__row_index
+				)
+				self.__row_index = None
+		except AttributeError:
+			# the constructor did not complete
+			pass
+
+	def __get_output_frame_buffer(self) -> DockerOutputFrameBuffer:
+		if self.__output_frame_buffer is None:
+			self.__output_frame_buffer = DockerOutputFrameBuffer(
+				maximum_payload_bytes_total=self.__maximum_output_bytes_total
+			)
+		return self.__output_frame_buffer
+
+	def __read_logs(self):
+		# the multiplexed log content is deterministic across requests, so the sent length is a byte cursor into it
+		api_client = self.__docker_client.api
+		response = api_client._get(
+			api_client._url("/containers/{0}/logs", self.__docker_container_id),
+			params={
+				"stdout": 1,
+				"stderr": 1,
+				"timestamps": 1,
+				"follow": 0,
+				"tail": "all"
+			},
+			stream=False
+		)
+		api_client._raise_for_status(response)
+		logs = response.content
+		if logs != b"":
+			sending_length = len(logs)
+			unsent_logs = self.__get_output_frame_buffer().append_docker_log_content(
+				content=logs[self.__docker_container_table.get_logs_sent_length(row_index=self.__row_index):sending_length]
+			)
+			self.__docker_container_table.set_logs_sent_length(
+				row_index=self.__row_index,
+				logs_sent_length=sending_length
+			)
+			if self.__stdout is None:
+				self.__stdout = b""
+			self.__stdout += unsent_logs
+
+	@staticmethod
+	def get_container_kwargs(*, is_docker_socket_needed: bool, resource_limits: DockerContainerResourceLimits, cache_volumes: List[DockerCacheVolume], labels: Dict[str, str] = None, coordinator: DockerCoordinator = None) -> Dict:
+		container_kwargs = {}
+		if labels:
+			container_kwargs["labels"] = labels
+		volumes = []  # type: List[str]
+		environment = {}  # type: Dict[str, str]
+		if is_docker_socket_needed:
+			volumes.append("/var/run/docker.sock:/var/run/docker.sock")
+			if coordinator is not None:
+				# a nested manager shares the daemon, so it joins the coordination of the manager that started it
+				volumes.extend(coordinator.get_container_volumes())
+				environment.update(coordinator.get_container_environment())
+		if cache_volumes:
+			for cache_volume in cache_volumes:
+				volumes.append(f"{cache_volume.get_name()}:{cache_volume.get_container_directory_path()}")
+				environment.update(cache_volume.get_environment())
+		if len(environment) != 0:
+			container_kwargs["environment"] = environment
+		if len(volumes) != 0:
+			container_kwargs["volumes"] = volumes
+		if resource_limits is not None:
+			container_kwargs.update(resource_limits.get_container_kwargs())
+		return container_kwargs
+
+	def __get_container_kwargs(self) -> Dict:
+		return DockerContainerInstance.get_container_kwargs(
+			is_docker_socket_needed=self.__is_docker_socket_needed,
+			resource_limits=self.__resource_limits,
+			cache_volumes=self.__cache_volumes,
+			labels=self.__labels,
+			coordinator=self.__coordinator
+		)
+
+	def get_name(self) -> str:
+		return self.__name
+
+	def get_resource_limits(self) -> DockerContainerResourceLimits:
+		return self.__resource_limits
+
+	def get_tracer(self) -> DockerTracer:
+		return self.__tracer
+
+	def get_trace_attributes(self) -> Dict:
+		return {
+			"container.name": self.__name,
+			"container.id": self.__docker_container_id
+		}
+
+	def get_docker_client(self) -> DockerClient:
+		return self.__docker_client
+
+	def get_container_id(self) -> str:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		return self.__docker_container_id
+
+	@DockerTracer.traced_method
+	def get_attrs(self) -> Dict:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		attrs = self.__docker_client.api.inspect_container(self.__docker_container_id)
+		self.__docker_container_table.set_status(
+			row_index=self.__row_index,
+			status=DockerContainerStatus.Running if attrs["State"]["Running"] else DockerContainerStatus.Created if attrs["State"]["Status"] == "created" else DockerContainerStatus.Exited
+		)
+		return attrs
+
+	@DockerTracer.traced_method
+	def get_stdout(self) -> bytes:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		self.__read_logs()
+		if self.__stdout is None:
+			return None
+		else:
+			line = self.__stdout
+			self.__stdout = None
+			return line
+
+	@DockerTracer.traced_method
+	def get_output_frames(self, *, stream_type: DockerOutputStreamType = None, start_timestamp: float = None, end_timestamp: float = None) -> Iterator[DockerOutputFrame]:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		self.__read_logs()
+		return self.__get_output_frame_buffer().get_frames(
+			stream_type=stream_type,
+			start_timestamp=start_timestamp,
+			end_timestamp=end_timestamp
+		)
+
+	@DockerTracer.traced_method
+	def duplicate_container(self, *, name: str, override_entrypoint_arguments: List[str] = None) -> DockerContainerInstance:
+		duplicate_docker_image_id = self.__docker_client.api.commit(
+			self.__docker_container_id,
+			repository=name,
+			conf=None if not self.__labels else {"Labels": self.__labels}
+		)["Id"]
+
+		if override_entrypoint_arguments is not None and len(override_entrypoint_arguments) != 0:
+			concat_entrypoint_arguments = ""
+			for entrypoint_argument_index, entrypoint_argument in enumerate(override_entrypoint_arguments):
+				if entrypoint_argument_index != 0:
+					concat_entrypoint_arguments += " "
+				concat_entrypoint_arguments += f"{entrypoint_argument}"
+
+			duplicate_docker_container = self.__docker_client.containers.create(
+				image=duplicate_docker_image_id,
+				name=name,
+				detach=True,
+				command=concat_entrypoint_arguments,
+				**self.__get_container_kwargs()
+			)  # type: Container
+		else:
+			duplicate_docker_container = self.__docker_client.containers.create(
+				image=duplicate_docker_image_id,
+				**self.__get_container_kwargs()
+			)  # type: Container
+		duplicate_docker_container_instance = DockerContainerInstance(
+			name=name,
+			docker_client=self.__docker_client,
+			docker_container_id=duplicate_docker_container.id,
+			image_id=duplicate_docker_image_id,
+			is_docker_socket_needed=self.__is_docker_socket_needed,
+			resource_limits=self.__resource_limits,
+			cache_volumes=self.__cache_volumes,
+			command_result_cache=self.__command_result_cache,
+			labels=self.__labels,
+			coordinator=self.__coordinator,
+			tracer=self.__tracer,
+			docker_container_table=self.__docker_container_table,
+			status=DockerContainerStatus.Created,
+			maximum_output_bytes_total=self.__maximum_output_bytes_total
+		)
+		return duplicate_docker_container_instance
+
+	def __update_state_hash(self, *, state_change: bytes):
+		import hashlib
+		self.__state_hash = hashlib.sha256(self.__state_hash.encode() + struct.pack(">Q", len(state_change)) + state_change).hexdigest()
+
+	@DockerTracer.traced_method
+	def execute_command(self, *, command: str, is_cacheable: bool = False) -> DockerCommandResult:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+
+		from docker.errors import APIError
+
+		command_result_key = None  # type: str
+		if is_cacheable and self.__command_result_cache is not None:
+			command_result_key = DockerCommandResultCache.get_key(
+				image_id=self.__image_id,
+				state_hash=self.__state_hash,
+				command=command
+			)
+			command_result = self.__command_result_cache.get(
+				key=command_result_key
+			)
+			if command_result is not None:
+				exit_code, output_frame_buffer = command_result
+				lines = b"".join(output_frame.payload for output_frame in output_frame_buffer.get_frames())
+				self.__get_output_frame_buffer().extend(
+					output_frame_buffer=output_frame_buffer
+				)
+				if self.__stdout is None:
+					self.__stdout = b""
+				self.__stdout += lines
+				self.__update_state_hash(
+					state_change=command.encode()
+				)
+				self.__tracer.get_current_span().set_attribute(
+					key="is_cached",
+					value=True
+				)
+				return DockerCommandResult(
+					output=lines,
+					exit_code=exit_code,
+					is_cached=True
+				)
+
+		is_successful = False
+		is_duplicate_required = False
+		try:
+			api_client = self.__docker_client.api
+			exec_id = api_client.exec_create(self.__docker_container_id, command, stdout=True, stderr=True)["Id"]
+			output_frame_buffer = DockerOutputFrameBuffer()
+			for stdout_chunk, stderr_chunk in api_client.exec_start(exec_id, stream=True, demux=True):
+				if stdout_chunk is not None:
+					output_frame_buffer.append(
+						stream_type=DockerOutputStreamType.Stdout,
+						timestamp=time.time(),
+						block=stdout_chunk
+					)
+				if stderr_chunk is not None:
+					output_frame_buffer.append(
+						stream_type=DockerOutputStreamType.Stderr,
+						timestamp=time.time(),
+						block=stderr_chunk
+					)
+			lines = b"".join(output_frame.payload for output_frame in output_frame_buffer.get_frames())
+			if b"exec failed" in lines or b"cannot exec in a stopped state" in lines:
+				is_duplicate_required = True
+			else:
+				exit_code = api_client.exec_inspect(exec_id)["ExitCode"]
+			is_successful = True
+		except APIError as ex:
+			if "409 Client Error" in str(ex) and " is not running" in str(ex):
+				is_duplicate_required = True
+			else:
+				raise ex
+
+		self.__tracer.get_current_span().set_attribute(
+			key="is_duplicate_required",
+			value=is_duplicate_required
+		)
+		# the command is run a second time in a duplicate of the container when it could not be executed in the container itself
+		self.__tracer.get_current_span().set_attribute(
+			key="retries",
+			value=1 if is_duplicate_required else 0
+		)
+
+		if is_duplicate_required:
+			import uuid
+			docker_clone_uuid = f"duplicate_{str(uuid.uuid4()).lower()}"
+
+			original_stdout = self.get_stdout()
+
+			duplicate_docker_container = self.duplicate_container(
+				name=docker_clone_uuid,
+				override_entrypoint_arguments=[command]
+			)
+			duplicate_docker_container.start()
+			exit_code = duplicate_docker_container.wait()
+
+			self.__stdout = original_stdout
+
+			# the output is read now, rather than later from the taken over container, so that it can be returned
+			output = duplicate_docker_container.get_stdout()
+			if self.__stdout is None:
+				self.__stdout = output
+			elif output is not None:
+				self.__stdout += output
+
+			# remove current container
+			self.__docker_client.api.remove_container(self.__docker_container_id)
+			self.__docker_client.api.remove_image(self.__name)
+
+			output_frame_buffer = duplicate_docker_container.__get_output_frame_buffer()
+			self.__get_output_frame_buffer().extend(
+				output_frame_buffer=output_frame_buffer
+			)
+
+			# take over duplicated container
+			self.__docker_container_id = duplicate_docker_container.__docker_container_id
+			self.__name = duplicate_docker_container.__name
+
+			# alter current container to behave correctly as a duplicate
+			self.__docker_container_table.set_is_duplicate(
+				row_index=self.__row_index,
+				is_duplicate=True
+			)
+			self.__docker_container_table.set_logs_sent_length(
+				row_index=self.__row_index,
+				logs_sent_length=self.__docker_container_table.get_logs_sent_length(
+					row_index=duplicate_docker_container.__row_index
+				)
+			)
+			self.__docker_container_table.set_status(
+				row_index=self.__row_index,
+				status=self.__docker_container_table.get_status(
+					row_index=duplicate_docker_container.__row_index
+				)
+			)
+
+			# the duplicate handle is discarded, so its row is freed now rather than whenever it is collected
+			duplicate_docker_container.__docker_container_id = None
+			duplicate_docker_container.__del__()
+
+			lines = b"".join(output_frame.payload for output_frame in output_frame_buffer.get_frames())
+
+		elif is_successful:
+			self.__get_output_frame_buffer().extend(
+				output_frame_buffer=output_frame_buffer
+			)
+			if self.__stdout is None:
+				self.__stdout = b""
+			self.__stdout += lines
+
+		if command_result_key is not None:
+			self.__command_result_cache.set(
+				key=command_result_key,
+				exit_code=exit_code,
+				output_frame_buffer=output_frame_buffer
+			)
+
+		self.__update_state_hash(
+			state_change=command.encode()
+		)
+
+		execute_command_span = self.__tracer.get_current_span()
+		execute_command_span.set_attribute(
+			key="exit_code",
+			value=exit_code
+		)
+		execute_command_span.set_attribute(
+			key="output.bytes",
+			value=len(lines)
+		)
+
+		return DockerCommandResult(
+			output=lines,
+			exit_code=exit_code,
+			is_cached=False
+		)
+
+	@DockerTracer.traced_method
+	def copy_file(self, *, source_file_path: str, destination_directory_path: str):
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		import tarfile
+		stream = io.BytesIO()
+		with tarfile.open(fileobj=stream, mode="w|") as tar, open(source_file_path, "rb") as source_file_handle:
+			tar_info = tar.gettarinfo(fileobj=source_file_handle)
+			tar_info.name = os.path.basename(source_file_path)
+			tar.addfile(tar_info, source_file_handle)
+		self.__docker_client.api.put_archive(self.__docker_container_id, destination_directory_path, stream.getvalue())
+		self.__tracer.get_current_span().set_attribute(
+			key="archive.bytes",
+			value=stream.tell()
+		)
+		import hashlib
+		file_hash = hashlib.sha256()
+		with open(source_file_path, "rb") as source_file_handle:
+			for chunk in iter(lambda: source_file_handle.read(1024 * 1024), b""):
+				file_hash.update(chunk)
+		self.__update_state_hash(
+			state_change=f"{destination_directory_path}\0{os.path.basename(source_file_path)}\0{file_hash.hexdigest()}".encode()
+		)
+
+	@DockerTracer.traced_method
+	def wait(self) -> int:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		status_code = self.__docker_client.api.wait(self.__docker_container_id)["StatusCode"]
+		self.__docker_container_table.set_status(
+			row_index=self.__row_index,
+			status=DockerContainerStatus.Exited
+		)
+		return status_code
+
+	def is_running(self) -> bool:
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		return self.__docker_container_table.get_status(
+			row_index=self.__row_index
+		) in [DockerContainerStatus.Running, DockerContainerStatus.Created]
+
+	@DockerTracer.traced_method
+	def stop(self):
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		if self.is_running():
+			self.__docker_client.api.stop(self.__docker_container_id)
+			self.__docker_container_table.set_status(
+				row_index=self.__row_index,
+				status=DockerContainerStatus.Exited
+			)
+
+	@DockerTracer.traced_method
+	def start(self):
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		self.__docker_client.api.start(self.__docker_container_id)
+		self.__docker_container_table.set_status(
+			row_index=self.__row_index,
+			status=DockerContainerStatus.Running
+		)
+
+	def get_reuses_total(self) -> int:
+		return self.__docker_container_table.get_reuses_total(
+			row_index=self.__row_index
+		)
+
+	@DockerTracer.traced_method
+	def reset(self, *, name: str):
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
+		if re.search(r"\s", name):
+			raise Exception(f"Name cannot contain whitespace.")
+		api_client = self.__docker_client.api
+		# discarding the container discards its writable layer, which rolls the filesystem back to the image
+		api_client.remove_container(self.__docker_container_id, force=True)
+		try:
+			# the previous id is kept until the replacement exists so that the handle never reads as removed part way through
+			docker_container_id = self.__docker_client.containers.run(
+				image=self.__image_id,
+				name=name,
+				detach=True,
+				stdout=True,
+				stderr=True,
+				**self.__get_container_kwargs()
+			).id
+		except Exception as ex:
+			# the previous container is already gone, so the handle is left removed with its cpus returned rather than half reset
+			try:
+				api_client.remove_image(self.__name)
+			except Exception:
+				pass
+			self.__docker_container_id = None
+			self.__docker_container_table.set_status(
+				row_index=self.__row_index,
+				status=DockerContainerStatus.Removed
+			)
+			if self.__cpuset_reservation is not None:
+				self.__cpuset_reservation.release()
+			raise ex
+		self.__docker_container_id = docker_container_id
+		api_client.tag(self.__image_id, name)
+		if self.__name != name:
+			api_client.remove_image(self.__name)
+		self.__name = name
+		self.__stdout = None
+		self.__output_frame_buffer = None
+		self.__state_hash = ""
+		self.__docker_container_table.set_logs_sent_length(
+			row_index=self.__row_index,
+			logs_sent_length=0
+		)
+		self.__docker_container_table.set_is_duplicate(
+			row_index=self.__row_index,
+			is_duplicate=False
+		)
+		self.__docker_container_table.set_status(
+			row_index=self.__row_index,
+			status=DockerContainerStatus.Running
+		)
+		self.__docker_container_table.set_reuses_total(
+			row_index=self.__row_index,
+			reuses_total=self.get_reuses_total() + 1
+		)
+
+	@DockerTracer.traced_method
+	def remove(self, *, is_forced: bool = False):
+		if self.__docker_container_id is None:
+			raise DockerContainerAlreadyRemovedException(f"Docker container already removed.")
+		if is_forced:
+			# kills rather than gracefully stops, saving the stop round trip and its grace period
+			self.__docker_client.api.remove_container(self.__docker_container_id, force=True)
+		else:
+			self.stop()
+			self.__docker_client.api.remove_container(self.__docker_container_id)
+		self.__docker_client.api.remove_image(self.__name)
+		self.__docker_container_id = None
+		self.__docker_container_table.set_status(
+			row_index=self.__row_index,
+			status=DockerContainerStatus.Removed
+		)
+		if self.__cpuset_reservation is not None:
+			self.__cpuset_reservation.release()
+
+
+class DockerContainerStatsSample(NamedTuple):
+	timestamp: float
+	cpu_percent: float
+	memory_usage_bytes: float
+	memory_limit_bytes: float
+	block_read_bytes: float
+	block_write_bytes: float
+	network_received_bytes: float
+	network_transmitted_bytes: float
+
+
+class DockerContainerStatsWindow(NamedTuple):
+	samples_total: int
+	seconds: float
+	cpu_percent_average: float
+	cpu_percent_maximum: float
+	memory_usage_bytes_average: float
+	memory_usage_bytes_maximum: float
+	block_read_bytes_per_second: float
+	block_write_bytes_per_second: float
+	network_received_bytes_per_second: float
+	network_transmitted_bytes_per_second: float
+
+
+class DockerContainerStatsRingBuffer():
+
+	def __init__(self, *, samples_total: int):
+
+		self.__samples_total = samples_total
+
+		# one flat array of fixed-width rows so that sampling never allocates
+		self.__fields_total = len(DockerContainerStatsSample._fields)
+		self.__values = array.array("d", bytes(8 * self.__fields_total * samples_total))
+		self.__next_sample_index = 0
+		self.__appended_samples_total = 0
+		self.__lock = threading.Lock()
 
+	def append(self, *, sample: DockerContainerStatsSample):
+		with self.__lock:
+			value_index = self.__next_sample_index * self.__fields_total
+			self.__values[value_index:value_index + self.__fields_total] = array.array("d", sample)
+			self.__next_sample_index = (self.__next_sample_index + 1) % self.__samples_total
+			self.__appended_samples_total += 1
 
-class FailedToFindContainerException(Exception):
+	def __get_sample(self, *, age_index: int) -> DockerContainerStatsSample:
+		# age_index 0 is the most recent sample
+		value_index = ((self.__next_sample_index - 1 - age_index) % self.__samples_total) * self.__fields_total
+		return DockerContainerStatsSample(*self.__values[value_index:value_index + self.__fields_total])
 
-	def __init__(self, *args: object):
-		super().__init__(*args)
+	def get_current(self) -> DockerContainerStatsSample:
+		with self.__lock:
+			if self.__appended_samples_total == 0:
+				return None
+			return self.__get_sample(
+				age_index=0
+			)
 
+	def get_window(self, *, seconds: float) -> DockerContainerStatsWindow:
+		with self.__lock:
+			available_samples_total = min(self.__appended_samples_total, self.__samples_total)
+			if available_samples_total == 0:
+				return None
+			latest_sample = self.__get_sample(
+				age_index=0
+			)
+			samples = [latest_sample]
+			for age_index in range(1, available_samples_total):
+				sample = self.__get_sample(
+					age_index=age_index
+				)
+				if sample.timestamp < latest_sample.timestamp - seconds:
+					break
+				samples.append(sample)
+		earliest_sample = samples[-1]
+		elapsed_seconds = latest_sample.timestamp - earliest_sample.timestamp
 
-class DockerContainerAlreadyRemovedException(Exception):
+		def get_per_second(field_index: int) -> float:
+			if elapsed_seconds <= 0:
+				return 0.0
+			return max(latest_sample[field_index] - earliest_sample[field_index], 0) / elapsed_seconds
 
-	def __init__(self, *args: object):
-		super().__init__(*args)
+		return DockerContainerStatsWindow(
+			samples_total=len(samples),
+			seconds=elapsed_seconds,
+			cpu_percent_average=sum(sample.cpu_percent for sample in samples) / len(samples),
+			cpu_percent_maximum=max(sample.cpu_percent for sample in samples),
+			memory_usage_bytes_average=sum(sample.memory_usage_bytes for sample in samples) / len(samples),
+			memory_usage_bytes_maximum=max(sample.memory_usage_bytes for sample in samples),
+			block_read_bytes_per_second=get_per_second(4),
+			block_write_bytes_per_second=get_per_second(5),
+			network_received_bytes_per_second=get_per_second(6),
+			network_transmitted_bytes_per_second=get_per_second(7)
+		)
 
 
-class DockerContainerInstance():
+class DockerContainerStatsSampler():
 
-	def __init__(self, *, name: str, docker_client: DockerClient, docker_container: Container, is_docker_socket_needed: bool):
+	def __init__(self, *, samples_total: int = 120):
 
-		self.__name = name
-		self.__docker_client = docker_client
-		self.__docker_container = docker_container
-		self.__is_docker_socket_needed = is_docker_socket_needed
+		self.__samples_total = samples_total
 
-		self.__stdout = None
-		self.__docker_container_logs_sent_length = 0
-		self.__is_duplicate = False
+		# the samples of a container that finished stay readable until it is unsubscribed or no longer referenced
+		self.__ring_buffer_per_instance = weakref.WeakKeyDictionary()  # type: Dict[DockerContainerInstance, DockerContainerStatsRingBuffer]
+		self.__reader_per_instance = {}  # type: Dict[DockerContainerInstance, threading.Thread]
+		self.__response_per_instance = {}  # type: Dict[DockerContainerInstance, object]
+		self.__lock = threading.Lock()
 
-	def get_stdout(self) -> bytes:
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		logs = self.__docker_container.logs()
-		if logs != b"":
-			sending_length = len(logs)
-			unsent_logs = logs[self.__docker_container_logs_sent_length:sending_length]
-			self.__docker_container_logs_sent_length = sending_length
-			if self.__stdout is None:
-				self.__stdout = b""
-			self.__stdout += unsent_logs
-		if self.__stdout is None:
-			return None
+	@staticmethod
+	def get_sample(*, stats: Dict, timestamp: float) -> DockerContainerStatsSample:
+		# follows the calculations of the docker cli so that values match "docker stats"
+		cpu_stats = stats.get("cpu_stats") or {}
+		precpu_stats = stats.get("precpu_stats") or {}
+		cpu_delta = (cpu_stats.get("cpu_usage") or {}).get("total_usage", 0) - (precpu_stats.get("cpu_usage") or {}).get("total_usage", 0)
+		system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+		online_cpus = cpu_stats.get("online_cpus") or len((cpu_stats.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+		if cpu_delta > 0 and system_delta > 0:
+			cpu_percent = cpu_delta / system_delta * online_cpus * 100.0
 		else:
-			line = self.__stdout
-			self.__stdout = None
-			return line
+			cpu_percent = 0.0
 
-	def duplicate_container(self, *, name: str, override_entrypoint_arguments: List[str] = None) -> DockerContainerInstance:
-		duplicate_docker_image = self.__docker_container.commit(
-			repository=name
-		)  # type: Image
+		memory_stats = stats.get("memory_stats") or {}
+		memory_usage_bytes = memory_stats.get("usage", 0)
+		memory_details = memory_stats.get("stats") or {}
+		if "total_inactive_file" in memory_details:
+			memory_usage_bytes -= memory_details["total_inactive_file"]
+		elif "inactive_file" in memory_details:
+			memory_usage_bytes -= memory_details["inactive_file"]
 
-		if override_entrypoint_arguments is not None and len(override_entrypoint_arguments) != 0:
-			concat_entrypoint_arguments = ""
-			for entrypoint_argument_index, entrypoint_argument in enumerate(override_entrypoint_arguments):
-				if entrypoint_argument_index != 0:
-					concat_entrypoint_arguments += " "
-				concat_entrypoint_arguments += f"{entrypoint_argument}"
+		block_read_bytes = 0
+		block_write_bytes = 0
+		for io_service_bytes in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+			operation = io_service_bytes.get("op", "").lower()
+			if operation == "read":
+				block_read_bytes += io_service_bytes.get("value", 0)
+			elif operation == "write":
+				block_write_bytes += io_service_bytes.get("value", 0)
 
-			if self.__is_docker_socket_needed:
-				duplicate_docker_container = self.__docker_client.containers.create(
-					image=duplicate_docker_image,
-					name=name,
-					detach=True,
-					command=concat_entrypoint_arguments,
-					volumes=["/var/run/docker.sock:/var/run/docker.sock"]
-				)
-			else:
-				duplicate_docker_container = self.__docker_client.containers.create(
-					image=duplicate_docker_image,
-					name=name,
-					detach=True,
-					command=concat_entrypoint_arguments
+		network_received_bytes = 0
+		network_transmitted_bytes = 0
+		for network in (stats.get("networks") or {}).values():
+			network_received_bytes += network.get("rx_bytes", 0)
+			network_transmitted_bytes += network.get("tx_bytes", 0)
+
+		return DockerContainerStatsSample(
+			timestamp=timestamp,
+			cpu_percent=cpu_percent,
+			memory_usage_bytes=memory_usage_bytes,
+			memory_limit_bytes=memory_stats.get("limit", 0),
+			block_read_bytes=block_read_bytes,
+			block_write_bytes=block_write_bytes,
+			network_received_bytes=network_received_bytes,
+			network_transmitted_bytes=network_transmitted_bytes
+		)
+
+	def __read_stats(self, *, docker_container_instance: DockerContainerInstance, ring_buffer: DockerContainerStatsRingBuffer):
+		# a streaming subscription costs one idle connection and a blocked thread, where polling with stream=False costs the daemon a full second per call
+		reader = threading.current_thread()
+		container_id = None
+		try:
+			while True:
+				with self.__lock:
+					if self.__reader_per_instance.get(docker_container_instance) is not reader:
+						return
+				try:
+					next_container_id = docker_container_instance.get_container_id()
+				except DockerContainerAlreadyRemovedException:
+					next_container_id = None
+				if next_container_id is None or next_container_id == container_id:
+					# the container was removed rather than replaced by a duplicate, and its samples stay readable until unsubscribe
+					return
+				container_id = next_container_id
+				# opening the stream waits on the daemon, so it happens outside of the lock that every other subscription and reader shares
+				api_client = docker_container_instance.get_docker_client().api
+				try:
+					response = api_client._get(
+						api_client._url("/containers/{0}/stats", container_id),
+						params={
+							"stream": True
+						},
+						stream=True
+					)
+					api_client._raise_for_status(response)
+				except Exception:
+					return
+				with self.__lock:
+					is_subscribed = self.__reader_per_instance.get(docker_container_instance) is reader
+					if is_subscribed:
+						self.__response_per_instance[docker_container_instance] = response
+				if not is_subscribed:
+					response.close()
+					return
+				try:
+					for line in response.iter_lines():
+						if line:
+							ring_buffer.append(
+								sample=DockerContainerStatsSampler.get_sample(
+									stats=json.loads(line),
+									timestamp=time.time()
+								)
+							)
+				except Exception:
+					pass
+				finally:
+					with self.__lock:
+						if self.__response_per_instance.get(docker_container_instance) is response:
+							del self.__response_per_instance[docker_container_instance]
+					response.close()
+		finally:
+			with self.__lock:
+				if self.__reader_per_instance.get(docker_container_instance) is reader:
+					del self.__reader_per_instance[docker_container_instance]
+
+	def subscribe(self, *, docker_container_instance: DockerContainerInstance):
+		with self.__lock:
+			if docker_container_instance in self.__reader_per_instance:
+				return
+			# a container reset after its stream ended keeps appending to the samples it already has
+			ring_buffer = self.__ring_buffer_per_instance.get(docker_container_instance)
+			if ring_buffer is None:
+				ring_buffer = DockerContainerStatsRingBuffer(
+					samples_total=self.__samples_total
 				)
-		else:
-			duplicate_docker_container = self.__docker_client.containers.create(
-				image=duplicate_docker_image
+				self.__ring_buffer_per_instance[docker_container_instance] = ring_buffer
+			reader = threading.Thread(
+				target=self.__read_stats,
+				kwargs={
+					"docker_container_instance": docker_container_instance,
+					"ring_buffer": ring_buffer
+				},
+				daemon=True
 			)
-		duplicate_docker_container_instance = DockerContainerInstance(
-			name=name,
-			docker_client=self.__docker_client,
-			docker_container=duplicate_docker_container,
-			is_docker_socket_needed=self.__is_docker_socket_needed
+			self.__reader_per_instance[docker_container_instance] = reader
+		reader.start()
+
+	def unsubscribe(self, *, docker_container_instance: DockerContainerInstance):
+		with self.__lock:
+			self.__ring_buffer_per_instance.pop(docker_container_instance, None)
+			self.__reader_per_instance.pop(docker_container_instance, None)
+			response = self.__response_per_instance.pop(docker_container_instance, None)
+		if response is not None:
+			response.close()
+
+	def is_subscribed(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		with self.__lock:
+			return docker_container_instance in self.__ring_buffer_per_instance
+
+	def get_current_sample(self, *, docker_container_instance: DockerContainerInstance) -> DockerContainerStatsSample:
+		with self.__lock:
+			ring_buffer = self.__ring_buffer_per_instance.get(docker_container_instance)
+		if ring_buffer is None:
+			return None
+		return ring_buffer.get_current()
+
+	def get_window(self, *, docker_container_instance: DockerContainerInstance, seconds: float) -> DockerContainerStatsWindow:
+		with self.__lock:
+			ring_buffer = self.__ring_buffer_per_instance.get(docker_container_instance)
+		if ring_buffer is None:
+			return None
+		return ring_buffer.get_window(
+			seconds=seconds
 		)
-		return duplicate_docker_container_instance
 
-	def execute_command(self, *, command: str):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		is_successful = False
-		is_duplicate_required = False
-		try:
-			lines = self.__docker_container.exec_run(command, stderr=True, stdout=True)
-			if "exec failed" in str(lines) or "cannot exec in a stopped state" in str(lines):
-				is_duplicate_required = True
-			is_successful = True
-		except APIError as ex:
-			if "409 Client Error" in str(ex) and " is not running" in str(ex):
-				is_duplicate_required = True
-			else:
-				raise ex
+	def dispose(self):
+		with self.__lock:
+			self.__ring_buffer_per_instance.clear()
+			self.__reader_per_instance.clear()
+			responses = list(self.__response_per_instance.values())
+			self.__response_per_instance.clear()
+		for response in responses:
+			response.close()
 
-		if is_duplicate_required:
-			docker_clone_uuid = f"duplicate_{str(uuid.uuid4()).lower()}"
 
-			original_stdout = self.get_stdout()
+class DockerContainerLogArchiveWriter():
 
-			duplicate_docker_container = self.duplicate_container(
-				name=docker_clone_uuid,
-				override_entrypoint_arguments=[command]
+	# each line is a record of stream type, timestamp and payload length followed by the payload, and records are gathered into blocks that are each written as a standalone gzip member so that the data file is also readable by any gzip tool
+	record_header_struct = struct.Struct(">BdI")
+	# data offset, compressed length, first line index, lines total, minimum timestamp and maximum timestamp of a block
+	index_entry_struct = struct.Struct(">QIQIdd")
+
+	def __init__(self, *, file_path: str, block_size_bytes: int = 1024 * 1024, compression_level: int = 6, maximum_block_age_seconds: float = None):
+
+		self.__file_path = file_path
+		self.__block_size_bytes = block_size_bytes
+		self.__compression_level = compression_level
+		self.__maximum_block_age_seconds = maximum_block_age_seconds
+
+		self.__data_file_handle = open(file_path, "ab")
+		self.__index_file_handle = open(DockerContainerLogArchive.get_index_file_path(
+			file_path=file_path
+		), "ab")
+
+		# an existing archive is continued, so line numbers carry on from its last block
+		self.__lines_total = 0
+		self.__maximum_timestamp = None  # type: float
+		index_length = self.__index_file_handle.tell()
+		index_entry_size = DockerContainerLogArchiveWriter.index_entry_struct.size
+		if index_length >= index_entry_size:
+			with open(DockerContainerLogArchive.get_index_file_path(
+				file_path=file_path
+			), "rb") as index_file_handle:
+				index_file_handle.seek(index_length - index_length % index_entry_size - index_entry_size)
+				_, _, first_line_index, lines_total, _, self.__maximum_timestamp = DockerContainerLogArchiveWriter.index_entry_struct.unpack(index_file_handle.read(index_entry_size))
+				self.__lines_total = first_line_index + lines_total
+
+		self.__block = bytearray()
+		self.__block_lines_total = 0
+		self.__block_minimum_timestamp = None  # type: float
+		self.__block_maximum_timestamp = None  # type: float
+		self.__block_start_time = None  # type: float
+		self.__lock = threading.Lock()
+
+	def get_file_path(self) -> str:
+		return self.__file_path
+
+	def get_maximum_timestamp(self) -> float:
+		with self.__lock:
+			return self.__maximum_timestamp
+
+	def is_block_expired(self) -> bool:
+		with self.__lock:
+			return self.__maximum_block_age_seconds is not None and self.__block_start_time is not None and time.monotonic() - self.__block_start_time >= self.__maximum_block_age_seconds
+
+	def append(self, *, stream_type: DockerOutputStreamType, timestamp: float, payload: bytes):
+		with self.__lock:
+			if self.__block_start_time is None:
+				self.__block_start_time = time.monotonic()
+			self.__block += DockerContainerLogArchiveWriter.record_header_struct.pack(stream_type, timestamp, len(payload))
+			self.__block += payload
+			self.__block_lines_total += 1
+			if self.__block_minimum_timestamp is None or timestamp < self.__block_minimum_timestamp:
+				self.__block_minimum_timestamp = timestamp
+			if self.__block_maximum_timestamp is None or timestamp > self.__block_maximum_timestamp:
+				self.__block_maximum_timestamp = timestamp
+			if self.__maximum_timestamp is None or timestamp > self.__maximum_timestamp:
+				self.__maximum_timestamp = timestamp
+			is_block_full = len(self.__block) >= self.__block_size_bytes
+		# a block that has been filling for too long is written early so that a low volume container is still archived while it runs
+		if is_block_full or self.is_block_expired():
+			self.flush()
+
+	def flush(self):
+		import gzip
+		with self.__lock:
+			if self.__block_lines_total == 0:
+				return
+			compressed_block = gzip.compress(bytes(self.__block), compresslevel=self.__compression_level)
+			data_offset = self.__data_file_handle.tell()
+			# the data is written before its index entry so that readers never find an entry pointing past the end of the data
+			self.__data_file_handle.write(compressed_block)
+			self.__data_file_handle.flush()
+			self.__index_file_handle.write(DockerContainerLogArchiveWriter.index_entry_struct.pack(
+				data_offset,
+				len(compressed_block),
+				self.__lines_total,
+				self.__block_lines_total,
+				self.__block_minimum_timestamp,
+				self.__block_maximum_timestamp
+			))
+			self.__index_file_handle.flush()
+			self.__lines_total += self.__block_lines_total
+			self.__block = bytearray()
+			self.__block_lines_total = 0
+			self.__block_minimum_timestamp = None
+			self.__block_maximum_timestamp = None
+			self.__block_start_time = None
+
+	def close(self):
+		self.flush()
+		with self.__lock:
+			self.__data_file_handle.close()
+			self.__index_file_handle.close()
+
+
+class DockerContainerLogArchive():
+
+	def __init__(self, *, file_path: str):
+
+		self.__file_path = file_path
+
+		self.__data_offsets = array.array("Q")
+		self.__compressed_lengths = array.array("I")
+		self.__first_line_indexes = array.array("Q")
+		self.__lines_totals = array.array("I")
+		self.__minimum_timestamps = array.array("d")
+		self.__maximum_timestamps = array.array("d")
+		self.__running_maximum_timestamps = array.array("d")
+		self.__is_sorted_by_timestamp = True
+		self.__index_length = 0
+		self.__lock = threading.Lock()
+
+	@staticmethod
+	def get_index_file_path(*, file_path: str) -> str:
+		return f"{file_path}.index"
+
+	def get_file_path(self) -> str:
+		return self.__file_path
+
+	def __load_index(self):
+		# the archive may still be written to, so only the index entries added since the previous load are read
+		index_entry_size = DockerContainerLogArchiveWriter.index_entry_struct.size
+		with self.__lock:
+			try:
+				with open(DockerContainerLogArchive.get_index_file_path(
+					file_path=self.__file_path
+				), "rb") as index_file_handle:
+					index_file_handle.seek(self.__index_length)
+					index_content = index_file_handle.read()
+			except FileNotFoundError:
+				return
+			index_content_length = len(index_content) - len(index_content) % index_entry_size
+			for data_offset, compressed_length, first_line_index, lines_total, minimum_timestamp, maximum_timestamp in DockerContainerLogArchiveWriter.index_entry_struct.iter_unpack(index_content[:index_content_length]):
+				if len(self.__maximum_timestamps) != 0 and minimum_timestamp < self.__maximum_timestamps[-1]:
+					self.__is_sorted_by_timestamp = False
+				self.__data_offsets.append(data_offset)
+				self.__compressed_lengths.append(compressed_length)
+				self.__first_line_indexes.append(first_line_index)
+				self.__lines_totals.append(lines_total)
+				self.__minimum_timestamps.append(minimum_timestamp)
+				self.__maximum_timestamps.append(maximum_timestamp)
+				self.__running_maximum_timestamps.append(maximum_timestamp if len(self.__running_maximum_timestamps) == 0 else max(maximum_timestamp, self.__running_maximum_timestamps[-1]))
+			self.__index_length += index_content_length
+
+	def __get_block_frames(self, *, block_index: int) -> Iterator[DockerOutputFrame]:
+		import gzip
+		with open(self.__file_path, "rb") as data_file_handle:
+			data_file_handle.seek(self.__data_offsets[block_index])
+			block = gzip.decompress(data_file_handle.read(self.__compressed_lengths[block_index]))
+		block_view = memoryview(block)
+		record_header_struct = DockerContainerLogArchiveWriter.record_header_struct
+		block_offset = 0
+		while block_offset < len(block):
+			stream_type, timestamp, payload_length = record_header_struct.unpack_from(block, block_offset)
+			payload_start_index = block_offset + record_header_struct.size
+			block_offset = payload_start_index + payload_length
+			yield DockerOutputFrame(
+				stream_type=DockerOutputStreamType(stream_type),
+				timestamp=timestamp,
+				payload=block_view[payload_start_index:block_offset]
 			)
-			duplicate_docker_container.start()
-			duplicate_docker_container.wait()
 
-			self.__stdout = original_stdout
+	def get_lines_total(self) -> int:
+		self.__load_index()
+		if len(self.__first_line_indexes) == 0:
+			return 0
+		return self.__first_line_indexes[-1] + self.__lines_totals[-1]
 
-			if self.__is_duplicate:
-				output = duplicate_docker_container.get_stdout()
-				if self.__stdout is None:
-					self.__stdout = output
-				else:
-					self.__stdout += output
+	def get_frames_by_line(self, *, start_line_index: int = 0, end_line_index: int = None) -> Iterator[DockerOutputFrame]:
+		# lines from start_line_index up to but excluding end_line_index, decompressing only the blocks that contain them
+		self.__load_index()
+		if end_line_index is None:
+			end_line_index = self.get_lines_total()
+		block_index = max(0, bisect.bisect_right(self.__first_line_indexes, start_line_index) - 1)
+		while block_index < len(self.__first_line_indexes) and self.__first_line_indexes[block_index] < end_line_index:
+			line_index = self.__first_line_indexes[block_index]
+			for frame in self.__get_block_frames(
+				block_index=block_index
+			):
+				if start_line_index <= line_index < end_line_index:
+					yield frame
+				line_index += 1
+			block_index += 1
 
-			# remove current container
-			self.__docker_container.remove()
-			self.__docker_client.images.remove(self.__name)
+	def get_frames(self, *, stream_type: DockerOutputStreamType = None, start_timestamp: float = None, end_timestamp: float = None) -> Iterator[DockerOutputFrame]:
+		self.__load_index()
+		block_index = 0 if start_timestamp is None else bisect.bisect_left(self.__running_maximum_timestamps, start_timestamp)
+		while block_index < len(self.__data_offsets):
+			if end_timestamp is not None and self.__minimum_timestamps[block_index] > end_timestamp:
+				if self.__is_sorted_by_timestamp:
+					break
+			else:
+				for frame in self.__get_block_frames(
+					block_index=block_index
+				):
+					if stream_type is not None and frame.stream_type != stream_type:
+						continue
+					if start_timestamp is not None and frame.timestamp < start_timestamp:
+						continue
+					if end_timestamp is not None and frame.timestamp > end_timestamp:
+						continue
+					yield frame
+			block_index += 1
 
-			# take over duplicated container
-			self.__docker_container = duplicate_docker_container.__docker_container
-			self.__name = duplicate_docker_container.__name
 
-			# alter current container to behave correctly as a duplicate
-			self.__is_duplicate = True
-			self.__docker_container_logs_sent_length = duplicate_docker_container.__docker_container_logs_sent_length
+class DockerContainerLogArchiver():
 
-		elif is_successful:
-			for line in lines:
-				if isinstance(line, int):
-					pass
-				else:
-					if self.__stdout is None:
-						self.__stdout = b""
-					print(f"line: {line}")
-					self.__stdout += line
+	def __init__(self, *, directory_path: str, block_size_bytes: int = 1024 * 1024, compression_level: int = 6, poll_interval_seconds: float = 1.0):
 
-	def copy_file(self, *, source_file_path: str, destination_directory_path: str):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		stream = io.BytesIO()
-		with tarfile.open(fileobj=stream, mode="w|") as tar, open(source_file_path, "rb") as source_file_handle:
-			tar_info = tar.gettarinfo(fileobj=source_file_handle)
-			tar_info.name = os.path.basename(source_file_path)
-			tar.addfile(tar_info, source_file_handle)
-		self.__docker_container.put_archive(destination_directory_path, stream.getvalue())
+		self.__directory_path = directory_path
+		self.__block_size_bytes = block_size_bytes
+		self.__compression_level = compression_level
+		self.__poll_interval_seconds = poll_interval_seconds
 
-	def wait(self):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		self.__docker_container.wait()
+		os.makedirs(directory_path, exist_ok=True)
 
-	def is_running(self) -> bool:
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		return self.__docker_container.status in ["running", "created"]
+		self.__writer_per_instance = {}  # type: Dict[DockerContainerInstance, DockerContainerLogArchiveWriter]
+		# unsubscribing still archives what the container logged before the call, such as the last lines of a container that was just stopped
+		self.__unsubscribe_timestamp_per_writer = {}  # type: Dict[DockerContainerLogArchiveWriter, float]
+		self.__thread_per_instance = {}  # type: Dict[DockerContainerInstance, threading.Thread]
+		# archives outlive their containers, so the file path is kept for as long as the caller holds the instance
+		self.__file_path_per_instance = weakref.WeakKeyDictionary()  # type: Dict[DockerContainerInstance, str]
+		self.__lock = threading.Lock()
+		self.__dispose_event = threading.Event()
 
-	def stop(self):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		if self.is_running():
-			self.__docker_container.stop()
-			#print(f"docker_manager: stop: self.__docker_container.status: {self.__docker_container.status}")
+	def __follow_logs(self, *, docker_container_instance: DockerContainerInstance, writer: DockerContainerLogArchiveWriter):
+		import requests.exceptions
+		timestamp_parser = DockerLogTimestampParser()
+		container_id = None
+		is_tty = None  # type: bool
+		# following a container again, such as after it was started again, continues its archive from the last archived line
+		previous_timestamp = writer.get_maximum_timestamp()
+		is_previous_request_failed = False
+		try:
+			while True:
+				with self.__lock:
+					if self.__writer_per_instance.get(docker_container_instance) is not writer:
+						return
+				try:
+					next_container_id = docker_container_instance.get_container_id()
+				except DockerContainerAlreadyRemovedException:
+					next_container_id = None
+				if next_container_id is None or (next_container_id == container_id and is_previous_request_failed):
+					# the container was removed rather than replaced by a duplicate
+					return
+				if next_container_id != container_id:
+					if container_id is not None:
+						previous_timestamp = None
+					container_id = next_container_id
+					is_tty = None
+				# the daemon is only asked once the lock is released, so a slow daemon never holds up subscribing other containers
+				api_client = docker_container_instance.get_docker_client().api
+				params = {
+					"stdout": 1,
+					"stderr": 1,
+					"timestamps": 1,
+					"follow": 1
+				}
+				if previous_timestamp is not None:
+					# reconnecting to the same container only asks for what has not been archived yet
+					params["since"] = f"{previous_timestamp:.9f}"
+				try:
+					if is_tty is None:
+						is_tty = api_client.inspect_container(container_id)["Config"]["Tty"]
+					# the read timeout bounds how long a quiet container can hold the follower, so that it notices being unsubscribed and flushes what it has buffered
+					response = api_client._get(
+						api_client._url("/containers/{0}/logs", container_id),
+						params=params,
+						stream=True,
+						timeout=self.__poll_interval_seconds
+					)
+					api_client._raise_for_status(response)
+					is_previous_request_failed = False
+				except requests.exceptions.Timeout:
+					is_previous_request_failed = False
+					response = None
+				except Exception:
+					# the container may have been removed just before the instance takes over its duplicate
+					is_previous_request_failed = True
+					response = None
+				is_stream_interrupted = response is None and not is_previous_request_failed
+				if response is not None:
+					since_timestamp = previous_timestamp
+					log_stream_parser = DockerLogStreamParser(
+						is_tty=is_tty
+					)
+					is_stream_ended = False
+					try:
+						for chunk in response.iter_content(chunk_size=None):
+							unsubscribe_timestamp = self.__unsubscribe_timestamp_per_writer.get(writer)
+							for stream_type, payload in log_stream_parser.append(
+								chunk=chunk
+							):
+								timestamp_end_index = payload.find(b" ")
+								if timestamp_end_index == -1:
+									timestamp = time.time()
+									timestamp_end_index = 0
+								else:
+									timestamp = timestamp_parser.get_timestamp(
+										timestamp_text=payload[:timestamp_end_index]
+									)
+									timestamp_end_index += 1
+								if self.__dispose_event.is_set() or (unsubscribe_timestamp is not None and timestamp > unsubscribe_timestamp):
+									is_stream_ended = True
+									break
+								if since_timestamp is None or timestamp > since_timestamp:
+									writer.append(
+										stream_type=stream_type,
+										timestamp=timestamp,
+										payload=payload[timestamp_end_index:]
+									)
+									previous_timestamp = timestamp
+							if is_stream_ended:
+								is_stream_interrupted = True
+								break
+					except Exception:
+						# the read timed out on a container that is still running, so it is followed again from the last archived line straight away
+						is_stream_interrupted = True
+					finally:
+						response.close()
+					writer.flush()
+				if is_stream_interrupted:
+					if self.__dispose_event.is_set():
+						return
+					continue
+				if not is_previous_request_failed:
+					# the daemon ends a followed stream cleanly once the container stops, and a container that is still stopped is not polled again until it is subscribed again
+					try:
+						is_running = api_client.inspect_container(container_id)["State"]["Running"]
+					except Exception:
+						is_running = False
+					if not is_running and docker_container_instance.get_container_id() == container_id:
+						return
+				if self.__dispose_event.wait(self.__poll_interval_seconds):
+					return
+		except DockerContainerAlreadyRemovedException:
+			pass
+		finally:
+			# the archive is complete before the container can be subscribed again, which continues it from its last line
+			writer.close()
+			with self.__lock:
+				if self.__writer_per_instance.get(docker_container_instance) is writer:
+					del self.__writer_per_instance[docker_container_instance]
+				if self.__thread_per_instance.get(docker_container_instance) is threading.current_thread():
+					del self.__thread_per_instance[docker_container_instance]
+				self.__unsubscribe_timestamp_per_writer.pop(writer, None)
 
-	def start(self):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container was previously removed.")
-		#print(f"docker_manager: start: self.is_running(): {self.is_running()}")
-		self.__docker_container.start()
+	def subscribe(self, *, docker_container_instance: DockerContainerInstance) -> str:
+		with self.__lock:
+			if docker_container_instance in self.__writer_per_instance:
+				return self.__file_path_per_instance[docker_container_instance]
+			file_path = os.path.join(self.__directory_path, f"{docker_container_instance.get_name()}_{docker_container_instance.get_container_id()[:12]}.log.gz")
+			writer = DockerContainerLogArchiveWriter(
+				file_path=file_path,
+				block_size_bytes=self.__block_size_bytes,
+				compression_level=self.__compression_level,
+				maximum_block_age_seconds=self.__poll_interval_seconds
+			)
+			self.__writer_per_instance[docker_container_instance] = writer
+			self.__file_path_per_instance[docker_container_instance] = file_path
+			thread = threading.Thread(
+				target=self.__follow_logs,
+				kwargs={
+					"docker_container_instance": docker_container_instance,
+					"writer": writer
+				},
+				daemon=True
+			)
+			self.__thread_per_instance[docker_container_instance] = thread
+		thread.start()
+		return file_path
 
-	def remove(self):
-		if self.__docker_container is None:
-			raise DockerContainerAlreadyRemovedException(f"Docker container already removed.")
-		self.stop()
-		self.__docker_container.remove()
-		self.__docker_client.images.remove(self.__name)
-		self.__docker_container = None
+	def unsubscribe(self, *, docker_container_instance: DockerContainerInstance):
+		with self.__lock:
+			writer = self.__writer_per_instance.pop(docker_container_instance, None)
+			if writer is not None:
+				self.__unsubscribe_timestamp_per_writer[writer] = time.time()
+			thread = self.__thread_per_instance.get(docker_container_instance)
+		# the follower stops at the first line logged after this call, and its read timeout wakes it within one poll interval when the container writes nothing
+		if thread is not None and thread is not threading.current_thread():
+			thread.join()
+
+	def is_subscribed(self, *, docker_container_instance: DockerContainerInstance) -> bool:
+		with self.__lock:
+			return docker_container_instance in self.__writer_per_instance
+
+	def get_archive(self, *, docker_container_instance: DockerContainerInstance) -> DockerContainerLogArchive:
+		with self.__lock:
+			file_path = self.__file_path_per_instance.get(docker_container_instance)
+		if file_path is None:
+			return None
+		return DockerContainerLogArchive(
+			file_path=file_path
+		)
+
+	def dispose(self):
+		self.__dispose_event.set()
+		with self.__lock:
+			self.__writer_per_instance.clear()
+			threads = list(self.__thread_per_instance.values())
+		# the followers flush and close their archives on the way out
+		for thread in threads:
+			thread.join()
+
+
+class DockerGarbageCollectionResult(NamedTuple):
+	containers_removed_total: int
+	images_removed_total: int
+	space_reclaimed_bytes: int
 
 
 class DockerManager():
 
-	def __init__(self, *, dockerfile_directory_path: str, is_docker_socket_needed: bool):
+	def __init__(self, *, dockerfile_directory_path: str, is_docker_socket_needed: bool, cpuset_scheduler: DockerCpusetScheduler = None, docker_base_url: str = None, stats_sampler: DockerContainerStatsSampler = None, start_scheduler: DockerStartScheduler = None, maximum_reuses_total: int = 0, cache_volumes: List[DockerCacheVolume] = None, command_result_cache: DockerCommandResultCache = None, log_archiver: DockerContainerLogArchiver = None, tracer: DockerTracer = None, coordinator: DockerCoordinator = None, cache_volume_eviction_interval_seconds: float = 600, maximum_output_bytes_total: int = 64 * 1024 * 1024):
 
 		self.__dockerfile_directory_path = dockerfile_directory_path
 		self.__is_docker_socket_needed = is_docker_socket_needed
+		self.__cpuset_scheduler = cpuset_scheduler
+		self.__docker_base_url = docker_base_url
+		self.__stats_sampler = stats_sampler
+		self.__start_scheduler = start_scheduler
+		self.__maximum_reuses_total = maximum_reuses_total
+		self.__cache_volumes = cache_volumes
+		self.__cache_volume_eviction_interval_seconds = cache_volume_eviction_interval_seconds
+		self.__command_result_cache = command_result_cache
+		self.__log_archiver = log_archiver
+		self.__tracer = DockerTracer() if tracer is None else tracer
+		self.__maximum_output_bytes_total = maximum_output_bytes_total
+		if coordinator is None and docker_base_url is None:
+			# a manager running inside a container started by a coordinated manager shares that manager's daemon
+			coordinator = DockerCoordinator.get_from_environment()
+		self.__coordinator = coordinator
+
+		self.__recycle_key_per_docker_container_instance = weakref.WeakKeyDictionary()  # type: Dict[DockerContainerInstance, Tuple]
+		self.__recyclable_docker_container_instances_per_recycle_key = {}  # type: Dict[Tuple, List[DockerContainerInstance]]
+		self.__recycle_lock = threading.Lock()
+		self.__docker_container_table = DockerContainerTable()
+		# measuring volumes asks the daemon to size every volume it has, so the budget is checked at most once per interval rather than on every start
+		self.__next_cache_volume_eviction_time = time.monotonic() + (0 if cache_volume_eviction_interval_seconds is None else cache_volume_eviction_interval_seconds)
+		self.__cache_volume_eviction_lock = threading.Lock()
+
+		import uuid
+		self.__labels = {
+			DOCKER_MANAGER_SESSION_LABEL: str(uuid.uuid4()).lower(),
+			DOCKER_MANAGER_PID_LABEL: str(os.getpid()),
+			DOCKER_MANAGER_HOSTNAME_LABEL: socket.gethostname()
+		}
+
+		self.__is_docker_client_from_environment = docker_base_url is None
+		self.__docker_client = None  # type: DockerClient
+		self.__docker_client_lock = threading.Lock()
+
+	def __get_docker_client(self) -> DockerClient:
+		# connecting, which also negotiates the api version with the daemon, waits until the daemon is first needed
+		if self.__docker_client is None:
+			with self.__docker_client_lock:
+				if self.__docker_client is None:
+					import docker
+					# a version shared by the coordinating manager skips the negotiation request, which None would otherwise make
+					api_version = None if self.__coordinator is None else self.__coordinator.get_api_version()
+					if self.__is_docker_client_from_environment:
+						self.__docker_client = docker.from_env(
+							version=api_version
+						)
+					else:
+						self.__docker_client = docker.DockerClient(
+							base_url=self.__docker_base_url,
+							version=api_version
+						)
+					if self.__coordinator is not None and self.__coordinator.get_api_version() is None:
+						self.__coordinator.set_api_version(
+							api_version=self.__docker_client.api.api_version
+						)
+					self.__tracer.instrument_api_client(
+						api_client=self.__docker_client.api
+					)
+		return self.__docker_client
+
+	def get_tracer(self) -> DockerTracer:
+		return self.__tracer
+
+	def get_trace_attributes(self) -> Dict:
+		return {
+			"dockerfile_directory_path": self.__dockerfile_directory_path,
+			"docker_base_url": self.__docker_base_url
+		}
+
+	def get_coordinator(self) -> DockerCoordinator:
+		return self.__coordinator
+
+	def get_labels(self) -> Dict[str, str]:
+		return dict(self.__labels)
+
+	def get_docker_container_table(self) -> DockerContainerTable:
+		return self.__docker_container_table
+
+	def get_docker_base_url(self) -> str:
+		return self.__get_docker_client().api.base_url
 
-		self.__is_docker_client_from_environment = True
-		self.__docker_client = docker.from_env()  # type: DockerClient
+	@DockerTracer.traced_method
+	def get_daemon_info(self) -> Dict:
+		return self.__get_docker_client().info()
 
+	@DockerTracer.traced_method
 	def is_image_exists(self, *, name: str) -> bool:
 
-		images = self.__docker_client.images.list()
-		for image in images:
-			if f"{name}:latest" in image.tags:
-				return True
-		return False
+		# inspecting the one image avoids listing every image on a daemon that nested managers share
+		import docker.errors
+		try:
+			self.__get_docker_client().api.inspect_image(f"{name}:latest")
+			return True
+		except docker.errors.ImageNotFound:
+			return False
 
+	@DockerTracer.traced_method
 	def is_container_exists(self, *, name: str) -> bool:
 
-		containers = self.__docker_client.containers.list()  # type: List[Container]
-		for container in containers:
-			if container.name == name:
-				return True
-		return False
+		# the daemon matches the name filter as a pattern, so the exact name is anchored, with or without its leading slash
+		containers = self.__get_docker_client().api.containers(filters={"name": f"^/?{re.escape(name)}$"})
+		return len(containers) != 0
 
+	@DockerTracer.traced_method
 	def get_existing_docker_container_instance_from_name(self, *, name: str) -> DockerContainerInstance:
 		if not self.is_container_exists(
 			name=name
 		):
 			raise FailedToFindContainerException(f"Failed to find container based on name \"{name}\".")
-		containers = self.__docker_client.containers()  # type: List[Container]
+		containers = self.__get_docker_client().containers.list()  # type: List[Container]
 		found_container = None
 		for container in containers:
 			if container.name == name:
@@ -244,16 +2828,107 @@ class DockerManager():
 			raise FailedToFindContainerException(f"Unexpected missing container after already finding it by name \"{name}\".")
 		docker_container_instance = DockerContainerInstance(
 			name=name,
-			docker_client=self.__docker_client,
-			docker_container=found_container,
-			is_docker_socket_needed=self.__is_docker_socket_needed
+			docker_client=self.__get_docker_client(),
+			docker_container_id=found_container.id,
+			image_id=found_container.attrs["Image"],
+			is_docker_socket_needed=self.__is_docker_socket_needed,
+			labels=self.__labels,
+			coordinator=self.__coordinator,
+			tracer=self.__tracer,
+			docker_container_table=self.__docker_container_table,
+			maximum_output_bytes_total=self.__maximum_output_bytes_total
 		)
 		return docker_container_instance
 
-	def start(self, *, name: str) -> DockerContainerInstance:
+	def __get_recycle_key(self, *, resource_limits: DockerContainerResourceLimits, cpus_total: int) -> Tuple:
+		container_kwargs = {} if resource_limits is None else resource_limits.get_container_kwargs()
+		if cpus_total is not None:
+			# the reserved cpuset differs per container but any reservation of the same size is interchangeable
+			container_kwargs.pop("cpuset_cpus", None)
+		return cpus_total, tuple(sorted(container_kwargs.items()))
+
+	def __get_recyclable_docker_container_instance(self, *, recycle_key: Tuple) -> DockerContainerInstance:
+		with self.__recycle_lock:
+			recyclable_docker_container_instances = self.__recyclable_docker_container_instances_per_recycle_key.get(recycle_key)
+			if not recyclable_docker_container_instances:
+				return None
+			return recyclable_docker_container_instances.pop()
+
+	@DockerTracer.traced_method
+	def recycle(self, *, docker_container_instance: DockerContainerInstance):
+		with self.__recycle_lock:
+			recycle_key = self.__recycle_key_per_docker_container_instance.get(docker_container_instance)
+			is_recyclable = recycle_key is not None and docker_container_instance.get_reuses_total() < self.__maximum_reuses_total
+			if not is_recyclable:
+				self.__recycle_key_per_docker_container_instance.pop(docker_container_instance, None)
+		if is_recyclable:
+			docker_container_instance.stop()
+			# the stopped container is about to be replaced, so its samples and log archive end here and start afresh for the next job
+			self.__unsubscribe(
+				docker_container_instance=docker_container_instance
+			)
+			with self.__recycle_lock:
+				self.__recyclable_docker_container_instances_per_recycle_key.setdefault(recycle_key, []).append(docker_container_instance)
+		else:
+			docker_container_instance.remove()
+
+	def __subscribe(self, *, docker_container_instance: DockerContainerInstance):
+		if self.__stats_sampler is not None:
+			self.__stats_sampler.subscribe(
+				docker_container_instance=docker_container_instance
+			)
+		if self.__log_archiver is not None:
+			self.__log_archiver.subscribe(
+				docker_container_instance=docker_container_instance
+			)
+
+	def __unsubscribe(self, *, docker_container_instance: DockerContainerInstance):
+		if self.__stats_sampler is not None:
+			self.__stats_sampler.unsubscribe(
+				docker_container_instance=docker_container_instance
+			)
+		if self.__log_archiver is not None:
+			self.__log_archiver.unsubscribe(
+				docker_container_instance=docker_container_instance
+			)
+
+	def get_recyclable_total(self) -> int:
+		with self.__recycle_lock:
+			return sum(len(recyclable_docker_container_instances) for recyclable_docker_container_instances in self.__recyclable_docker_container_instances_per_recycle_key.values())
+
+	def __wait_until_ready(self, *, docker_container_instance: DockerContainerInstance, ready: DockerReadinessProbe, ready_timeout_seconds: float):
+		if ready is None:
+			return
+		try:
+			is_ready = ready.wait(
+				docker_container_instance=docker_container_instance,
+				timeout_seconds=ready_timeout_seconds
+			)
+		except Exception as ex:
+			is_ready = False
+			ready_exception = ex
+		else:
+			ready_exception = None
+		self.__tracer.get_current_span().set_attribute(
+			key="is_ready",
+			value=is_ready
+		)
+		if not is_ready:
+			# callers never receive a container that is not ready, so it is discarded rather than left for them to clean up
+			with self.__recycle_lock:
+				self.__recycle_key_per_docker_container_instance.pop(docker_container_instance, None)
+			docker_container_instance.remove(
+				is_forced=True
+			)
+			raise DockerContainerNotReadyException(f"Container \"{docker_container_instance.get_name()}\" was not ready within {ready_timeout_seconds} seconds.") from ready_exception
+
+	@DockerTracer.traced_method
+	def start(self, *, name: str, resource_limits: DockerContainerResourceLimits = None, cpus_total: int = None, cpuset_timeout_seconds: float = 0, priority: DockerStartPriority = DockerStartPriority.Normal, ready: DockerReadinessProbe = None, ready_timeout_seconds: float = 60) -> DockerContainerInstance:
 
 		if re.search(r"\s", name):
 			raise Exception(f"Name cannot contain whitespace.")
+		elif cpus_total is not None and self.__cpuset_scheduler is None:
+			raise Exception(f"Cannot reserve cpus without a cpuset scheduler.")
 		else:
 			if self.is_image_exists(
 				name=name
@@ -262,38 +2937,544 @@ class DockerManager():
 			):
 				raise DockerContainerInstanceAlreadyExistsException(f"Cannot start image/container with the same name \"{name}\".")
 
-			self.__docker_client.images.build(
-				path=self.__dockerfile_directory_path,
-				tag=name,
-				rm=True
+			self.__evict_cache_volumes_if_due()
+
+			recycle_key = self.__get_recycle_key(
+				resource_limits=resource_limits,
+				cpus_total=cpus_total
+			)
+			recyclable_docker_container_instance = self.__get_recyclable_docker_container_instance(
+				recycle_key=recycle_key
 			)
+			self.__tracer.get_current_span().set_attribute(
+				key="is_recycled",
+				value=recyclable_docker_container_instance is not None
+			)
+			if recyclable_docker_container_instance is not None:
+				# skips the build entirely, leaving only the container replacement on the per-job path
+				try:
+					if self.__start_scheduler is None:
+						recyclable_docker_container_instance.reset(
+							name=name
+						)
+					else:
+						self.__start_scheduler.start(
+							priority=priority,
+							start_function=lambda: recyclable_docker_container_instance.reset(
+								name=name
+							)
+						)
+				except Exception as ex:
+					with self.__recycle_lock:
+						self.__recycle_key_per_docker_container_instance.pop(recyclable_docker_container_instance, None)
+					raise ex
+				self.__subscribe(
+					docker_container_instance=recyclable_docker_container_instance
+				)
+				self.__wait_until_ready(
+					docker_container_instance=recyclable_docker_container_instance,
+					ready=ready,
+					ready_timeout_seconds=ready_timeout_seconds
+				)
+				return recyclable_docker_container_instance
+
+			def build_image() -> str:
+				# cache volumes are not mounted into builds, since the classic builder that the docker client drives cannot mount volumes into RUN steps, so builds reuse docker's own layer cache and receive only the volumes' build arguments
+				build_arguments = {}  # type: Dict[str, str]
+				if self.__cache_volumes:
+					for cache_volume in self.__cache_volumes:
+						build_arguments.update(cache_volume.get_build_arguments())
 
-			if self.__is_docker_socket_needed:
-				docker_container = self.__docker_client.containers.run(
-					image=name,
-					name=name,
-					detach=True,
-					stdout=True,
-					stderr=True,
-					volumes=["/var/run/docker.sock:/var/run/docker.sock"]
+				def build(labels: Dict[str, str]) -> str:
+					docker_image, _ = self.__get_docker_client().images.build(
+						path=self.__dockerfile_directory_path,
+						tag=name,
+						rm=True,
+						buildargs=build_arguments,
+						labels=labels
+					)  # type: Image
+					return docker_image.id
+
+				if self.__coordinator is None:
+					return build(self.__labels)
+				coordinator_build_key = DockerCoordinator.get_build_key(
+					dockerfile_directory_path=self.__dockerfile_directory_path,
+					build_arguments=build_arguments
+				)
+				image_id = self.__coordinator.get_image_id(
+					build_key=coordinator_build_key,
+					# a session label would let garbage collection prune the shared image once this manager's process has exited
+					build_function=lambda: build({
+						DOCKER_MANAGER_BUILD_CACHE_LABEL: coordinator_build_key
+					}),
+					api_client=self.__get_docker_client().api
 				)
+				# the image may have been built by another manager in the tree under its own name
+				self.__get_docker_client().api.tag(image_id, name)
+				return image_id
+
+			if self.__start_scheduler is None:
+				build_image()
 			else:
-				docker_container = self.__docker_client.containers.run(
-					image=name,
-					name=name,
-					detach=True,
-					stdout=True,
-					stderr=True
+				image_id = self.__start_scheduler.build(
+					build_key=f"{self.__docker_base_url or os.environ.get('DOCKER_HOST', '')}|{os.path.realpath(self.__dockerfile_directory_path)}",
+					priority=priority,
+					build_function=build_image
+				)
+				# waiters that shared another start's build still need the image under their own name
+				self.__get_docker_client().api.tag(image_id, name)
+
+			cpuset_reservation = None  # type: DockerCpusetReservation
+			if cpus_total is not None:
+				cpuset_reservation = self.__cpuset_scheduler.reserve(
+					cpus_total=cpus_total,
+					timeout_seconds=cpuset_timeout_seconds
+				)
+				if resource_limits is None:
+					resource_limits = DockerContainerResourceLimits()
+				resource_limits = resource_limits.get_copy(
+					cpuset_cpus=cpuset_reservation.get_cpuset_cpus()
 				)
 
+			container_kwargs = DockerContainerInstance.get_container_kwargs(
+				is_docker_socket_needed=self.__is_docker_socket_needed,
+				resource_limits=resource_limits,
+				cache_volumes=self.__cache_volumes,
+				labels=self.__labels,
+				coordinator=self.__coordinator
+			)
+
+			def run_container() -> Container:
+				if self.__coordinator is None:
+					return self.__get_docker_client().containers.run(
+						image=name,
+						name=name,
+						detach=True,
+						stdout=True,
+						stderr=True,
+						**container_kwargs
+					)
+				with self.__coordinator.acquire_slot() as coordinator_slot:
+					self.__tracer.get_current_span().set_attribute(
+						key="coordinator.slot_retries",
+						value=coordinator_slot.get_retries_total()
+					)
+					return self.__get_docker_client().containers.run(
+						image=name,
+						name=name,
+						detach=True,
+						stdout=True,
+						stderr=True,
+						**container_kwargs
+					)
+
+			try:
+				if self.__start_scheduler is None:
+					docker_container = run_container()
+				else:
+					docker_container = self.__start_scheduler.start(
+						priority=priority,
+						start_function=run_container
+					)
+			except Exception as ex:
+				if cpuset_reservation is not None:
+					cpuset_reservation.release()
+				raise ex
+
 			docker_container_instance = DockerContainerInstance(
 				name=name,
-				docker_client=self.__docker_client,
-				docker_container=docker_container,
-				is_docker_socket_needed=self.__is_docker_socket_needed
+				docker_client=self.__get_docker_client(),
+				docker_container_id=docker_container.id,
+				image_id=docker_container.attrs["Image"],
+				is_docker_socket_needed=self.__is_docker_socket_needed,
+				resource_limits=resource_limits,
+				cpuset_reservation=cpuset_reservation,
+				cache_volumes=self.__cache_volumes,
+				command_result_cache=self.__command_result_cache,
+				labels=self.__labels,
+				coordinator=self.__coordinator,
+				tracer=self.__tracer,
+				docker_container_table=self.__docker_container_table,
+				maximum_output_bytes_total=self.__maximum_output_bytes_total
+			)
+
+			if self.__maximum_reuses_total > 0:
+				with self.__recycle_lock:
+					self.__recycle_key_per_docker_container_instance[docker_container_instance] = recycle_key
+
+			self.__subscribe(
+				docker_container_instance=docker_container_instance
+			)
+
+			self.__wait_until_ready(
+				docker_container_instance=docker_container_instance,
+				ready=ready,
+				ready_timeout_seconds=ready_timeout_seconds
 			)
 
 			return docker_container_instance
 
+	@DockerTracer.traced_method
+	def get_cache_volume_sizes(self) -> Dict[str, int]:
+		cache_volume_names = set() if self.__cache_volumes is None else set(cache_volume.get_name() for cache_volume in self.__cache_volumes)
+		cache_volume_sizes = {}  # type: Dict[str, int]
+		for volume in self.__get_docker_client().df().get("Volumes") or []:
+			if volume["Name"] in cache_volume_names:
+				cache_volume_sizes[volume["Name"]] = (volume.get("UsageData") or {}).get("Size", 0)
+		return cache_volume_sizes
+
+	@DockerTracer.traced_method
+	def evict_cache_volumes(self) -> List[str]:
+		# eviction drops the entire cache rather than its oldest entries, since docker can only report and remove whole volumes, so an evicted cache starts empty on its next mount
+		evicted_cache_volume_names = []  # type: List[str]
+		if not self.__cache_volumes:
+			return evicted_cache_volume_names
+		import docker.errors
+		cache_volume_sizes = self.get_cache_volume_sizes()
+		for cache_volume in self.__cache_volumes:
+			maximum_size_bytes = cache_volume.get_maximum_size_bytes()
+			if maximum_size_bytes is not None and cache_volume_sizes.get(cache_volume.get_name(), 0) > maximum_size_bytes:
+				try:
+					self.__get_docker_client().api.remove_volume(cache_volume.get_name())
+					evicted_cache_volume_names.append(cache_volume.get_name())
+				except docker.errors.APIError as ex:
+					if ex.status_code != 409:
+						raise ex
+					# still mounted by a container, so it is evicted on a later pass
+		return evicted_cache_volume_names
+
+	def __evict_cache_volumes_if_due(self):
+		if not self.__cache_volumes or self.__cache_volume_eviction_interval_seconds is None:
+			return
+		with self.__cache_volume_eviction_lock:
+			if time.monotonic() < self.__next_cache_volume_eviction_time:
+				return
+			self.__next_cache_volume_eviction_time = time.monotonic() + self.__cache_volume_eviction_interval_seconds
+		self.evict_cache_volumes()
+
+	def __is_session_orphaned(self, *, labels: Dict[str, str]) -> bool:
+		if labels.get(DOCKER_MANAGER_SESSION_LABEL) == self.__labels[DOCKER_MANAGER_SESSION_LABEL]:
+			return False
+		if labels.get(DOCKER_MANAGER_HOSTNAME_LABEL) != self.__labels[DOCKER_MANAGER_HOSTNAME_LABEL]:
+			# whether a process on another host is still alive cannot be checked from here
+			return False
+		try:
+			pid = int(labels.get(DOCKER_MANAGER_PID_LABEL))
+		except (TypeError, ValueError):
+			return True
+		return not DockerManager.__is_process_alive(
+			pid=pid
+		)
+
+	@staticmethod
+	def __is_process_alive(*, pid: int) -> bool:
+		if os.name == "nt":
+			# os.kill terminates the process on Windows for any signal other than the console events, so its state is queried instead
+			import ctypes
+			kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+			kernel32.OpenProcess.restype = ctypes.c_void_p
+			process_handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+			if not process_handle:
+				# ERROR_INVALID_PARAMETER means there is no such process, while anything else, such as being denied access, is taken as alive
+				return ctypes.get_last_error() != 87
+			try:
+				exit_code = ctypes.c_ulong()
+				if not kernel32.GetExitCodeProcess(ctypes.c_void_p(process_handle), ctypes.byref(exit_code)):
+					return True
+				return exit_code.value == 259  # STILL_ACTIVE
+			finally:
+				kernel32.CloseHandle(ctypes.c_void_p(process_handle))
+		try:
+			os.kill(pid, 0)
+		except ProcessLookupError:
+			return False
+		except PermissionError:
+			# alive but owned by another user
+			return True
+		return True
+
+	@DockerTracer.traced_method
+	def collect_garbage(self, *, maximum_workers_total: int = 8) -> DockerGarbageCollectionResult:
+		from concurrent.futures import ThreadPoolExecutor
+		import docker.errors
+
+		api_client = self.__get_docker_client().api
+
+		orphaned_container_ids = []  # type: List[str]
+		orphaned_sessions = set()
+		for container in api_client.containers(all=True, filters={"label": DOCKER_MANAGER_SESSION_LABEL}):
+			labels = container.get("Labels") or {}
+			if self.__is_session_orphaned(
+				labels=labels
+			):
+				orphaned_container_ids.append(container["Id"])
+				orphaned_sessions.add(labels[DOCKER_MANAGER_SESSION_LABEL])
+		for image in api_client.images(filters={"label": DOCKER_MANAGER_SESSION_LABEL}):
+			labels = image.get("Labels") or {}
+			if self.__is_session_orphaned(
+				labels=labels
+			):
+				orphaned_sessions.add(labels[DOCKER_MANAGER_SESSION_LABEL])
+
+		def remove_container(container_id: str) -> int:
+			try:
+				api_client.remove_container(container_id, force=True)
+				return 1
+			except docker.errors.NotFound:
+				# removed concurrently by another collector
+				return 0
+
+		def prune_images(session: str) -> Tuple[int, int]:
+			# prune skips images still in use, so an image shared with a live container survives
+			prune_result = api_client.prune_images(filters={
+				"dangling": False,
+				"label": f"{DOCKER_MANAGER_SESSION_LABEL}={session}"
+			})
+			images_removed_total = sum(1 for image_deleted in prune_result.get("ImagesDeleted") or [] if "Deleted" in image_deleted)
+			return images_removed_total, prune_result.get("SpaceReclaimed") or 0
+
+		containers_removed_total = 0
+		images_removed_total = 0
+		space_reclaimed_bytes = 0
+		if len(orphaned_sessions) != 0:
+			with ThreadPoolExecutor(max_workers=maximum_workers_total) as executor:
+				# containers hold references to their images, so all of them are removed before any image is pruned
+				containers_removed_total = sum(executor.map(self.__tracer.get_context_function(
+					function=remove_container
+				), orphaned_container_ids))
+				for session_images_removed_total, session_space_reclaimed_bytes in executor.map(self.__tracer.get_context_function(
+					function=prune_images
+				), sorted(orphaned_sessions)):
+					images_removed_total += session_images_removed_total
+					space_reclaimed_bytes += session_space_reclaimed_bytes
+
+		return DockerGarbageCollectionResult(
+			containers_removed_total=containers_removed_total,
+			images_removed_total=images_removed_total,
+			space_reclaimed_bytes=space_reclaimed_bytes
+		)
+
+	@DockerTracer.traced_method
+	def remove_many(self, *, docker_container_instances: List[DockerContainerInstance], maximum_workers_total: int = 8):
+		if len(docker_container_instances) == 0:
+			return
+		from concurrent.futures import ThreadPoolExecutor
+		with self.__recycle_lock:
+			for docker_container_instance in docker_container_instances:
+				self.__recycle_key_per_docker_container_instance.pop(docker_container_instance, None)
+		with ThreadPoolExecutor(max_workers=min(maximum_workers_total, len(docker_container_instances))) as executor:
+			futures = [executor.submit(self.__tracer.get_context_function(
+				function=docker_container_instance.remove
+			), is_forced=True) for docker_container_instance in docker_container_instances]
+			# every removal is attempted before the first failure is raised
+			for future in futures:
+				future.result()
+
+	@DockerTracer.traced_method
+	def dispose(self):
+		with self.__recycle_lock:
+			recyclable_docker_container_instances = [recyclable_docker_container_instance for recyclable_docker_container_instances in self.__recyclable_docker_container_instances_per_recycle_key.values() for recyclable_docker_container_instance in recyclable_docker_container_instances]
+			self.__recyclable_docker_container_instances_per_recycle_key.clear()
+			self.__recycle_key_per_docker_container_instance.clear()
+		self.remove_many(
+			docker_container_instances=recyclable_docker_container_instances
+		)
+		if self.__cache_volumes and self.__cache_volume_eviction_interval_seconds is not None and self.__docker_client is not None:
+			# the recycled containers no longer mount the caches, so this is the last point at which this manager can hold them to their budget
+			self.evict_cache_volumes()
+		if self.__docker_client is not None:
+			self.__docker_client.close()
+
+
+class DockerClusterPlacementStrategy(Enum):
+	RunningContainersTotal = "running_containers_total"
+	RunningContainersPerCpu = "running_containers_per_cpu"
+
+
+class DockerCluster():
+
+	def __init__(self, *, dockerfile_directory_path: str, is_docker_socket_needed: bool, docker_base_urls: List[str], placement_strategy: DockerClusterPlacementStrategy = DockerClusterPlacementStrategy.RunningContainersTotal, tracer: DockerTracer = None, cpuset_schedulers: List[DockerCpusetScheduler] = None, start_scheduler: DockerStartScheduler = None, load_refresh_interval_seconds: float = 1.0):
+
+		self.__placement_strategy = placement_strategy
+		self.__load_refresh_interval_seconds = load_refresh_interval_seconds
+
+		self.__docker_managers = []  # type: List[DockerManager]
+		for docker_manager_index, docker_base_url in enumerate(docker_base_urls):
+			self.__docker_managers.append(DockerManager(
+				dockerfile_directory_path=dockerfile_directory_path,
+				is_docker_socket_needed=is_docker_socket_needed,
+				# each daemon has its own cpus, so a scheduler per daemon is needed for starts that reserve cpus
+				cpuset_scheduler=None if cpuset_schedulers is None else cpuset_schedulers[docker_manager_index],
+				docker_base_url=docker_base_url,
+				start_scheduler=start_scheduler,
+				tracer=tracer
+			))
+
+		# starts that have been placed but are not yet reported by their daemon as running
+		self.__pending_starts_totals = [0] * len(self.__docker_managers)
+		# starts that completed after their daemon's info was last requested, and so are not yet in its running total
+		self.__unreported_starts_totals = [0] * len(self.__docker_managers)
+		# daemon info is refreshed in the background so that placing a start costs no round trips, and a daemon whose last refresh failed holds None and is skipped until it answers again
+		self.__daemon_infos = [None] * len(self.__docker_managers)  # type: List[Dict]
+		self.__is_daemon_info_refreshed_events = [threading.Event() for _ in self.__docker_managers]
+		self.__docker_manager_index_per_name = {}  # type: Dict[str, int]
+		# names reserved by starts that have not returned yet, which are in use even though their daemon may not report them
+		self.__starting_names = set()
+		self.__placement_lock = threading.Lock()
+		self.__refresh_threads = None  # type: List[threading.Thread]
+		self.__refresh_threads_lock = threading.Lock()
+		self.__dispose_event = threading.Event()
+
+	def get_docker_managers(self) -> List[DockerManager]:
+		return list(self.__docker_managers)
+
+	def __refresh_daemon_info(self, *, docker_manager_index: int):
+		# each daemon is refreshed by its own thread, so a slow or unreachable daemon never delays the others
+		while not self.__dispose_event.is_set():
+			with self.__placement_lock:
+				reported_starts_total = self.__unreported_starts_totals[docker_manager_index]
+			try:
+				daemon_info = self.__docker_managers[docker_manager_index].get_daemon_info()
+			except Exception:
+				daemon_info = None
+			with self.__placement_lock:
+				if daemon_info is not None:
+					self.__unreported_starts_totals[docker_manager_index] -= reported_starts_total
+				self.__daemon_infos[docker_manager_index] = daemon_info
+			self.__is_daemon_info_refreshed_events[docker_manager_index].set()
+			self.__dispose_event.wait(self.__load_refresh_interval_seconds)
+
+	def __wait_for_daemon_infos(self):
+		with self.__refresh_threads_lock:
+			if self.__refresh_threads is None:
+				# the threads start with the first placement, so constructing a cluster does not connect to its daemons
+				self.__refresh_threads = []
+				for docker_manager_index in range(len(self.__docker_managers)):
+					refresh_thread = threading.Thread(
+						target=self.__refresh_daemon_info,
+						kwargs={
+							"docker_manager_index": docker_manager_index
+						},
+						daemon=True
+					)
+					refresh_thread.start()
+					self.__refresh_threads.append(refresh_thread)
+		# only the first placement waits, until every daemon has answered or failed once
+		for is_daemon_info_refreshed_event in self.__is_daemon_info_refreshed_events:
+			is_daemon_info_refreshed_event.wait()
+
+	def __get_load(self, *, docker_manager_index: int) -> float:
+		daemon_info = self.__daemon_infos[docker_manager_index]
+		running_containers_total = daemon_info["ContainersRunning"] + self.__pending_starts_totals[docker_manager_index] + self.__unreported_starts_totals[docker_manager_index]
+		if self.__placement_strategy == DockerClusterPlacementStrategy.RunningContainersTotal:
+			return running_containers_total
+		elif self.__placement_strategy == DockerClusterPlacementStrategy.RunningContainersPerCpu:
+			return running_containers_total / max(daemon_info["NCPU"], 1)
+		else:
+			raise NotImplementedError(f"Placement strategy not implemented: {self.__placement_strategy}.")
+
+	def __get_least_loaded_docker_manager_index(self) -> int:
+		available_docker_manager_indexes = [docker_manager_index for docker_manager_index in range(len(self.__docker_managers)) if self.__daemon_infos[docker_manager_index] is not None]
+		if len(available_docker_manager_indexes) == 0:
+			raise Exception(f"No daemon in the cluster is reachable.")
+		return min(available_docker_manager_indexes, key=lambda docker_manager_index: self.__get_load(
+			docker_manager_index=docker_manager_index
+		))
+
+	def __get_placed_docker_manager_index(self, *, name: str) -> int:
+		with self.__placement_lock:
+			if name in self.__starting_names:
+				return self.__docker_manager_index_per_name[name]
+			docker_manager_index = self.__docker_manager_index_per_name.get(name)
+		if docker_manager_index is None:
+			return None
+		# the daemon is asked outside of the lock, so a slow daemon only delays callers using one of its names
+		docker_manager = self.__docker_managers[docker_manager_index]
+		if docker_manager.is_image_exists(
+			name=name
+		) or docker_manager.is_container_exists(
+			name=name
+		):
+			return docker_manager_index
+		with self.__placement_lock:
+			# the instance was removed since it was placed, unless the name was placed again in the meantime
+			if name not in self.__starting_names and self.__docker_manager_index_per_name.get(name) == docker_manager_index:
+				del self.__docker_manager_index_per_name[name]
+		return None
+
+	def get_least_loaded_docker_manager(self) -> DockerManager:
+		self.__wait_for_daemon_infos()
+		with self.__placement_lock:
+			docker_manager_index = self.__get_least_loaded_docker_manager_index()
+		return self.__docker_managers[docker_manager_index]
+
+	def start(self, *, name: str, resource_limits: DockerContainerResourceLimits = None, cpus_total: int = None, cpuset_timeout_seconds: float = 0, priority: DockerStartPriority = DockerStartPriority.Normal, ready: DockerReadinessProbe = None, ready_timeout_seconds: float = 60) -> DockerContainerInstance:
+
+		self.__wait_for_daemon_infos()
+
+		if self.__get_placed_docker_manager_index(
+			name=name
+		) is not None:
+			raise DockerContainerInstanceAlreadyExistsException(f"Cannot start image/container with the same name \"{name}\".")
+
+		with self.__placement_lock:
+			# only the in-memory reservation is checked here, and the placed daemon's own start rejects a name it already has
+			if name in self.__docker_manager_index_per_name:
+				raise DockerContainerInstanceAlreadyExistsException(f"Cannot start image/container with the same name \"{name}\".")
+			docker_manager_index = self.__get_least_loaded_docker_manager_index()
+			self.__docker_manager_index_per_name[name] = docker_manager_index
+			self.__starting_names.add(name)
+			self.__pending_starts_totals[docker_manager_index] += 1
+
+		try:
+			# the returned instance keeps the docker client of the daemon it was placed on, so every later call is routed there
+			docker_container_instance = self.__docker_managers[docker_manager_index].start(
+				name=name,
+				resource_limits=resource_limits,
+				cpus_total=cpus_total,
+				cpuset_timeout_seconds=cpuset_timeout_seconds,
+				priority=priority,
+				ready=ready,
+				ready_timeout_seconds=ready_timeout_seconds
+			)
+		except Exception as ex:
+			with self.__placement_lock:
+				del self.__docker_manager_index_per_name[name]
+				self.__starting_names.discard(name)
+				self.__pending_starts_totals[docker_manager_index] -= 1
+			raise ex
+		with self.__placement_lock:
+			self.__starting_names.discard(name)
+			self.__pending_starts_totals[docker_manager_index] -= 1
+			self.__unreported_starts_totals[docker_manager_index] += 1
+		return docker_container_instance
+
+	def get_docker_manager_from_name(self, *, name: str) -> DockerManager:
+		docker_manager_index = self.__get_placed_docker_manager_index(
+			name=name
+		)
+		if docker_manager_index is not None:
+			return self.__docker_managers[docker_manager_index]
+		for docker_manager in self.__docker_managers:
+			if docker_manager.is_container_exists(
+				name=name
+			):
+				return docker_manager
+		raise FailedToFindContainerException(f"Failed to find container based on name \"{name}\".")
+
+	def get_existing_docker_container_instance_from_name(self, *, name: str) -> DockerContainerInstance:
+		return self.get_docker_manager_from_name(
+			name=name
+		).get_existing_docker_container_instance_from_name(
+			name=name
+		)
+
 	def dispose(self):
-		self.__docker_client.close()
+		self.__dispose_event.set()
+		with self.__refresh_threads_lock:
+			refresh_threads = [] if self.__refresh_threads is None else list(self.__refresh_threads)
+		# a refresh in flight finishes before the clients it uses are closed
+		for refresh_thread in refresh_threads:
+			refresh_thread.join()
+		for docker_manager in self.__docker_managers:
+			docker_manager.dispose()
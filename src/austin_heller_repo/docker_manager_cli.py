@@ -0,0 +1,249 @@
+from __future__ import annotations
+from typing import List, NamedTuple
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from .docker_manager import DockerManager, DockerStartScheduler
+
+
+class DockerManagerBatchFile(NamedTuple):
+	source_file_path: str
+	destination_directory_path: str
+
+
+class DockerManagerBatchJob(NamedTuple):
+	name: str
+	dockerfile_directory_path: str
+	files: List[DockerManagerBatchFile]
+	commands: List[str]
+	is_docker_socket_needed: bool
+
+
+class DockerManagerBatchJobResult(NamedTuple):
+	name: str
+	exit_code: int
+	start_seconds: float
+	commands_seconds: float
+	total_seconds: float
+	output_file_path: str
+	exception: str
+
+
+class DockerManagerBatchManifest(NamedTuple):
+	jobs: List[DockerManagerBatchJob]
+	maximum_concurrent_jobs_total: int
+
+
+def get_manifest_from_file(*, manifest_file_path: str) -> DockerManagerBatchManifest:
+	# relative paths in the manifest are relative to the manifest itself rather than to where the command is run
+	manifest_directory_path = os.path.dirname(os.path.abspath(manifest_file_path))
+	with open(manifest_file_path, "r") as manifest_file_handle:
+		if manifest_file_path.endswith((".yaml", ".yml")):
+			try:
+				import yaml
+			except ImportError:
+				raise Exception(f"Reading YAML manifests requires PyYAML, available through the \"yaml\" extra of this package.")
+			manifest = yaml.safe_load(manifest_file_handle)
+		else:
+			manifest = json.load(manifest_file_handle)
+
+	jobs = []  # type: List[DockerManagerBatchJob]
+	names = set()
+	for job in manifest["jobs"]:
+		name = job["name"]
+		if name in names:
+			raise Exception(f"Job name \"{name}\" is not unique within the manifest.")
+		names.add(name)
+		jobs.append(DockerManagerBatchJob(
+			name=name,
+			dockerfile_directory_path=os.path.join(manifest_directory_path, job["dockerfile_directory_path"]),
+			files=[
+				DockerManagerBatchFile(
+					source_file_path=os.path.join(manifest_directory_path, file["source_file_path"]),
+					destination_directory_path=file["destination_directory_path"]
+				) for file in job.get("files", [])
+			],
+			commands=list(job.get("commands", [])),
+			is_docker_socket_needed=job.get("is_docker_socket_needed", manifest.get("is_docker_socket_needed", False))
+		))
+	maximum_concurrent_jobs_total = manifest.get("maximum_concurrent_jobs_total", os.cpu_count() or 1)
+	if isinstance(maximum_concurrent_jobs_total, bool) or not isinstance(maximum_concurrent_jobs_total, int) or maximum_concurrent_jobs_total <= 0:
+		raise Exception(f"Manifest maximum_concurrent_jobs_total must be a positive integer, not {maximum_concurrent_jobs_total!r}.")
+	return DockerManagerBatchManifest(
+		jobs=jobs,
+		maximum_concurrent_jobs_total=maximum_concurrent_jobs_total
+	)
+
+
+class DockerManagerBatchRunner():
+
+	def __init__(self, *, output_directory_path: str, maximum_concurrent_jobs_total: int, docker_base_url: str = None):
+
+		self.__output_directory_path = output_directory_path
+		self.__maximum_concurrent_jobs_total = maximum_concurrent_jobs_total
+		self.__docker_base_url = docker_base_url
+
+		# jobs sharing a Dockerfile directory share one build and at most as many containers are created at once as there are jobs, while the job threads are what bound how many containers are running
+		self.__start_scheduler = DockerStartScheduler(
+			maximum_concurrent_builds_total=maximum_concurrent_jobs_total,
+			maximum_concurrent_starts_total=maximum_concurrent_jobs_total
+		)
+		self.__print_lock = threading.Lock()
+
+	def __run_job(self, *, job: DockerManagerBatchJob) -> DockerManagerBatchJobResult:
+		output_file_path = os.path.join(self.__output_directory_path, f"{job.name}.log")
+		start_time = time.perf_counter()
+		start_seconds = 0.0
+		commands_seconds = 0.0
+		exit_code = None  # type: int
+		exception = None  # type: str
+		docker_manager = DockerManager(
+			dockerfile_directory_path=job.dockerfile_directory_path,
+			is_docker_socket_needed=job.is_docker_socket_needed,
+			docker_base_url=self.__docker_base_url,
+			start_scheduler=self.__start_scheduler
+		)
+		docker_container_instance = None
+		with open(output_file_path, "wb") as output_file_handle:
+
+			def write_output():
+				# output is written as soon as it is read so that a long job can be followed with tail
+				output = docker_container_instance.get_stdout()
+				if output:
+					output_file_handle.write(output)
+					output_file_handle.flush()
+
+			try:
+				docker_container_instance = docker_manager.start(
+					name=job.name
+				)
+				start_seconds = time.perf_counter() - start_time
+
+				for file in job.files:
+					docker_container_instance.copy_file(
+						source_file_path=file.source_file_path,
+						destination_directory_path=file.destination_directory_path
+					)
+
+				commands_start_time = time.perf_counter()
+				for command in job.commands:
+					command_result = docker_container_instance.execute_command(
+						command=command
+					)
+					write_output()
+					if command_result.exit_code != 0:
+						exit_code = command_result.exit_code
+						break
+				commands_seconds = time.perf_counter() - commands_start_time
+
+				wait_exit_code = docker_container_instance.wait()
+				write_output()
+				if exit_code is None:
+					exit_code = wait_exit_code
+			except Exception as ex:
+				exception = str(ex)
+			finally:
+				if docker_container_instance is not None:
+					try:
+						docker_container_instance.remove()
+					except Exception as ex:
+						if exception is None:
+							exception = str(ex)
+				docker_manager.dispose()
+
+		job_result = DockerManagerBatchJobResult(
+			name=job.name,
+			exit_code=exit_code,
+			start_seconds=start_seconds,
+			commands_seconds=commands_seconds,
+			total_seconds=time.perf_counter() - start_time,
+			output_file_path=output_file_path,
+			exception=exception
+		)
+		with self.__print_lock:
+			print(f"{job.name}: {'failed' if DockerManagerBatchRunner.is_job_failed(job_result=job_result) else 'succeeded'} in {job_result.total_seconds:.2f}s", file=sys.stderr)
+		return job_result
+
+	@staticmethod
+	def is_job_failed(*, job_result: DockerManagerBatchJobResult) -> bool:
+		return job_result.exception is not None or job_result.exit_code != 0
+
+	def run(self, *, jobs: List[DockerManagerBatchJob]) -> List[DockerManagerBatchJobResult]:
+		from concurrent.futures import ThreadPoolExecutor
+		os.makedirs(self.__output_directory_path, exist_ok=True)
+		if len(jobs) == 0:
+			return []
+		with ThreadPoolExecutor(max_workers=min(self.__maximum_concurrent_jobs_total, len(jobs))) as executor:
+			return list(executor.map(lambda job: self.__run_job(job=job), jobs))
+
+
+def get_timing_summary(*, job_results: List[DockerManagerBatchJobResult], wall_seconds: float) -> str:
+	name_width = max([len("job")] + [len(job_result.name) for job_result in job_results])
+	lines = [
+		f"{'job':<{name_width}}  {'exit':>5}  {'start':>9}  {'commands':>9}  {'total':>9}"
+	]
+	for job_result in job_results:
+		exit_text = "error" if job_result.exception is not None else str(job_result.exit_code)
+		lines.append(f"{job_result.name:<{name_width}}  {exit_text:>5}  {job_result.start_seconds:>8.2f}s  {job_result.commands_seconds:>8.2f}s  {job_result.total_seconds:>8.2f}s")
+	failed_total = sum(1 for job_result in job_results if DockerManagerBatchRunner.is_job_failed(
+		job_result=job_result
+	))
+	jobs_seconds = sum(job_result.total_seconds for job_result in job_results)
+	lines.append(f"{len(job_results)} jobs, {failed_total} failed, {wall_seconds:.2f}s wall, {jobs_seconds:.2f}s summed across jobs")
+	return "\n".join(lines)
+
+
+def get_positive_int(text: str) -> int:
+	try:
+		value = int(text)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+	if value <= 0:
+		raise argparse.ArgumentTypeError(f"must be a positive integer, not {value}")
+	return value
+
+
+def main(argv: List[str] = None) -> int:
+
+	argument_parser = argparse.ArgumentParser(
+		prog="docker-manager",
+		description="Run the jobs of a JSON or YAML manifest in parallel containers."
+	)
+	argument_parser.add_argument("manifest_file_path", help="path to the manifest")
+	argument_parser.add_argument("-j", "--jobs", type=get_positive_int, default=None, help="maximum jobs run at once, overriding the manifest")
+	argument_parser.add_argument("-o", "--output-directory", default="docker_manager_output", help="directory that receives one output file per job")
+	argument_parser.add_argument("--docker-base-url", default=None, help="docker daemon to use instead of the environment's")
+	arguments = argument_parser.parse_args(argv)
+
+	manifest = get_manifest_from_file(
+		manifest_file_path=arguments.manifest_file_path
+	)
+
+	docker_manager_batch_runner = DockerManagerBatchRunner(
+		output_directory_path=arguments.output_directory,
+		maximum_concurrent_jobs_total=manifest.maximum_concurrent_jobs_total if arguments.jobs is None else arguments.jobs,
+		docker_base_url=arguments.docker_base_url
+	)
+
+	start_time = time.perf_counter()
+	job_results = docker_manager_batch_runner.run(
+		jobs=manifest.jobs
+	)
+	wall_seconds = time.perf_counter() - start_time
+
+	print(get_timing_summary(
+		job_results=job_results,
+		wall_seconds=wall_seconds
+	))
+	for job_result in job_results:
+		if job_result.exception is not None:
+			print(f"{job_result.name}: {job_result.exception}", file=sys.stderr)
+
+	return 1 if any(DockerManagerBatchRunner.is_job_failed(job_result=job_result) for job_result in job_results) else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
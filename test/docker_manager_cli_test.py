@@ -0,0 +1,175 @@
+import unittest
+from src.austin_heller_repo.docker_manager_cli import main, get_manifest_from_file, get_timing_summary, DockerManagerBatchJobResult
+import docker
+import tempfile
+import os
+import json
+import contextlib
+import io
+
+
+class DockerManagerCliTest(unittest.TestCase):
+
+	def setUp(self):
+
+		docker_client = docker.from_env()
+
+		for name in ["test_cli_helloworld", "test_cli_helloworld_2", "test_cli_failing"]:
+
+			try:
+				docker_client.api.remove_container(name, force=True)
+			except Exception as ex:
+				pass
+
+			try:
+				docker_client.images.remove(
+					image=name
+				)
+			except Exception as ex:
+				pass
+
+		docker_client.close()
+
+	def test_manifest_paths_relative_to_manifest(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			manifest_file_path = os.path.join(temp_directory_path, "manifest.json")
+			with open(manifest_file_path, "w") as manifest_file_handle:
+				json.dump({
+					"maximum_concurrent_jobs_total": 2,
+					"jobs": [
+						{
+							"name": "test_cli_helloworld",
+							"dockerfile_directory_path": "dockerfiles/helloworld",
+							"files": [
+								{
+									"source_file_path": "script.py",
+									"destination_directory_path": "/"
+								}
+							],
+							"commands": [
+								"python /script.py"
+							]
+						}
+					]
+				}, manifest_file_handle)
+
+			manifest = get_manifest_from_file(
+				manifest_file_path=manifest_file_path
+			)
+
+		self.assertEqual(2, manifest.maximum_concurrent_jobs_total)
+		self.assertEqual(1, len(manifest.jobs))
+		self.assertEqual(os.path.join(temp_directory_path, "dockerfiles/helloworld"), manifest.jobs[0].dockerfile_directory_path)
+		self.assertEqual(os.path.join(temp_directory_path, "script.py"), manifest.jobs[0].files[0].source_file_path)
+		self.assertEqual(["python /script.py"], manifest.jobs[0].commands)
+		self.assertFalse(manifest.jobs[0].is_docker_socket_needed)
+
+	def test_rejects_non_positive_jobs_total(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			manifest_file_path = os.path.join(temp_directory_path, "manifest.json")
+			with open(manifest_file_path, "w") as manifest_file_handle:
+				json.dump({
+					"maximum_concurrent_jobs_total": 0,
+					"jobs": []
+				}, manifest_file_handle)
+
+			with self.assertRaises(Exception):
+				get_manifest_from_file(
+					manifest_file_path=manifest_file_path
+				)
+
+			for jobs_text in ["0", "-1", "two"]:
+				with contextlib.redirect_stderr(io.StringIO()):
+					with self.assertRaises(SystemExit):
+						main(["-j", jobs_text, manifest_file_path])
+
+	def test_timing_summary(self):
+
+		timing_summary = get_timing_summary(
+			job_results=[
+				DockerManagerBatchJobResult(
+					name="first",
+					exit_code=0,
+					start_seconds=1.0,
+					commands_seconds=2.0,
+					total_seconds=3.5,
+					output_file_path="first.log",
+					exception=None
+				),
+				DockerManagerBatchJobResult(
+					name="second",
+					exit_code=None,
+					start_seconds=0.0,
+					commands_seconds=0.0,
+					total_seconds=0.5,
+					output_file_path="second.log",
+					exception="failed to build"
+				)
+			],
+			wall_seconds=3.5
+		)
+
+		lines = timing_summary.split("\n")
+
+		self.assertEqual(4, len(lines))
+		self.assertIn("error", lines[2])
+		self.assertEqual("2 jobs, 1 failed, 3.50s wall, 4.00s summed across jobs", lines[3])
+
+	def test_main_runs_manifest_in_parallel(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			manifest_file_path = os.path.join(temp_directory_path, "manifest.json")
+			dockerfile_directory_path = os.path.abspath(os.path.join(".", "dockerfiles", "helloworld"))
+			with open(manifest_file_path, "w") as manifest_file_handle:
+				json.dump({
+					"jobs": [
+						{
+							"name": "test_cli_helloworld",
+							"dockerfile_directory_path": dockerfile_directory_path,
+							"commands": [
+								"echo first"
+							]
+						},
+						{
+							"name": "test_cli_helloworld_2",
+							"dockerfile_directory_path": dockerfile_directory_path
+						},
+						{
+							"name": "test_cli_failing",
+							"dockerfile_directory_path": dockerfile_directory_path,
+							"commands": [
+								"false",
+								"echo unreachable"
+							]
+						}
+					]
+				}, manifest_file_handle)
+
+			output_directory_path = os.path.join(temp_directory_path, "output")
+
+			stdout = io.StringIO()
+			with contextlib.redirect_stdout(stdout):
+				exit_code = main([
+					manifest_file_path,
+					"--jobs", "3",
+					"--output-directory", output_directory_path
+				])
+
+			with open(os.path.join(output_directory_path, "test_cli_helloworld.log"), "rb") as output_file_handle:
+				first_output = output_file_handle.read()
+			with open(os.path.join(output_directory_path, "test_cli_helloworld_2.log"), "rb") as output_file_handle:
+				second_output = output_file_handle.read()
+			with open(os.path.join(output_directory_path, "test_cli_failing.log"), "rb") as output_file_handle:
+				failing_output = output_file_handle.read()
+
+		self.assertEqual(1, exit_code)
+		self.assertIn(b"Hello world!\n", first_output)
+		self.assertIn(b"first\n", first_output)
+		self.assertEqual(b"Hello world!\n", second_output)
+		self.assertNotIn(b"unreachable", failing_output)
+		self.assertIn("3 jobs, 1 failed", stdout.getvalue())
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+import os
+import statistics
+from typing import List
+
+
+def get_import_seconds(*, module_name: str, iterations_total: int) -> List[float]:
+	repository_directory_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	import_seconds = []  # type: List[float]
+	for _ in range(iterations_total):
+		# each import happens in a fresh interpreter so that nothing is already cached in sys.modules
+		completed_process = subprocess.run(
+			[sys.executable, "-c", f"import time\nstart_time = time.perf_counter()\nimport {module_name}\nprint(time.perf_counter() - start_time)"],
+			cwd=repository_directory_path,
+			capture_output=True,
+			check=True
+		)
+		import_seconds.append(float(completed_process.stdout.decode().strip()))
+	return import_seconds
+
+
+if __name__ == "__main__":
+
+	iterations_total = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+	for module_name in ["src.austin_heller_repo.docker_manager", "docker"]:
+		import_seconds = get_import_seconds(
+			module_name=module_name,
+			iterations_total=iterations_total
+		)
+		print(f"{module_name}: median {statistics.median(import_seconds) * 1000:.1f} ms, minimum {min(import_seconds) * 1000:.1f} ms over {iterations_total} imports")
@@ -1,5 +1,5 @@
 import unittest
-from src.austin_heller_repo.docker_manager import DockerManager, DockerContainerInstance, DockerContainerInstanceAlreadyExistsException, DockerContainerAlreadyRemovedException
+from src.austin_heller_repo.docker_manager import DockerManager, DockerContainerInstance, DockerContainerInstanceAlreadyExistsException, DockerContainerAlreadyRemovedException, DockerOutputStreamType, DockerOutputFrameBuffer, DockerContainerResourceLimits, DockerCpusetScheduler, DockerCpusetUnavailableException, DockerCluster, DockerClusterPlacementStrategy, DockerContainerStatsSampler, DockerStartScheduler, DockerStartPriority, DockerCacheVolume, DockerCommandResultCache, DockerContainerTable, DockerContainerStatus, DOCKER_MANAGER_SESSION_LABEL, DOCKER_MANAGER_PID_LABEL, DOCKER_MANAGER_BUILD_CACHE_LABEL, DockerContainerLogArchiver, DockerContainerLogArchiveWriter, DockerContainerLogArchive, DockerExecReadinessProbe, DockerTcpReadinessProbe, DockerLogPatternReadinessProbe, DockerHealthcheckReadinessProbe, DockerContainerNotReadyException, DockerTracer, DockerTraceExporter, DockerFileTraceExporter, DockerReadinessProbe, DockerCoordinator, DockerCoordinatorTimeoutException
 import tempfile
 import docker.models.images
 import docker.errors
@@ -8,6 +8,59 @@ from datetime import datetime
 import os
 import gc
 import json
+import socketserver
+import http.server
+import threading
+from typing import Dict
+import zipfile
+import hashlib
+import base64
+import functools
+import subprocess
+import sys
+import shutil
+
+
+class StandInDockerDaemon():
+
+	def __init__(self, *, socket_file_path: str, daemon_info: Dict):
+
+		self.__socket_file_path = socket_file_path
+
+		class StandInDockerDaemonRequestHandler(http.server.BaseHTTPRequestHandler):
+
+			def do_GET(self):
+				if self.path.endswith("/version"):
+					response = {"ApiVersion": "1.41", "Version": "20.10.0"}
+				elif self.path.endswith("/info"):
+					response = daemon_info
+				else:
+					self.send_error(404)
+					return
+				response_bytes = json.dumps(response).encode()
+				self.send_response(200)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(response_bytes)))
+				self.end_headers()
+				self.wfile.write(response_bytes)
+
+			def address_string(self) -> str:
+				return self.__class__.__name__
+
+			def log_message(self, format: str, *args) -> None:
+				pass
+
+		self.__server = socketserver.ThreadingUnixStreamServer(socket_file_path, StandInDockerDaemonRequestHandler)
+		self.__server.daemon_threads = True
+		self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+		self.__thread.start()
+
+	def get_docker_base_url(self) -> str:
+		return f"unix://{self.__socket_file_path}"
+
+	def dispose(self):
+		self.__server.shutdown()
+		self.__server.server_close()
 
 
 class DockerManagerTest(unittest.TestCase):
@@ -25,7 +78,12 @@ class DockerManagerTest(unittest.TestCase):
 			"contains_script",
 			"helloworld_2",
 			"contains_script_2",
-			"spawns_container"
+			"spawns_container",
+			"stdout_and_stderr",
+			"helloworld_3",
+			"ready_after_two_seconds",
+			"ready_after_two_seconds_2",
+			"installs_stand_in_package"
 		]
 
 		for image_name in image_names:
@@ -57,6 +115,11 @@ class DockerManagerTest(unittest.TestCase):
 			except Exception as ex:
 				pass
 
+		try:
+			docker_client.volumes.get("test_docker_manager_pip_cache").remove(force=True)
+		except Exception as ex:
+			pass
+
 		docker_client.close()
 
 	def test_initialize_docker_manager(self):
@@ -648,3 +711,1429 @@ class DockerManagerTest(unittest.TestCase):
 		docker_container_instance.stop()
 		docker_container_instance.remove()
 		docker_manager.dispose()
+
+	def test_stdout_and_stderr_output_frames(self):
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/stdout_and_stderr",
+			is_docker_socket_needed=False
+		)
+
+		docker_container_instance = docker_manager.start(
+			name="test_stdout_and_stderr"
+		)
+
+		docker_container_instance.wait()
+
+		output_frames = list(docker_container_instance.get_output_frames())
+		stdout_frames = list(docker_container_instance.get_output_frames(
+			stream_type=DockerOutputStreamType.Stdout
+		))
+		stderr_frames = list(docker_container_instance.get_output_frames(
+			stream_type=DockerOutputStreamType.Stderr
+		))
+		later_output_frames = list(docker_container_instance.get_output_frames(
+			start_timestamp=output_frames[1].timestamp
+		))
+
+		docker_container_instance.execute_command(
+			command="python -c \"import sys; print('exec_error', file=sys.stderr)\""
+		)
+
+		exec_stderr_frames = list(docker_container_instance.get_output_frames(
+			stream_type=DockerOutputStreamType.Stderr
+		))
+
+		docker_container_instance.stop()
+		docker_container_instance.remove()
+		docker_manager.dispose()
+
+		self.assertEqual([b"first\n", b"error\n", b"second\n"], [bytes(output_frame.payload) for output_frame in output_frames])
+		self.assertEqual([b"first\n", b"second\n"], [bytes(output_frame.payload) for output_frame in stdout_frames])
+		self.assertEqual([b"error\n"], [bytes(output_frame.payload) for output_frame in stderr_frames])
+		self.assertEqual([b"error\n", b"second\n"], [bytes(output_frame.payload) for output_frame in later_output_frames])
+		self.assertLessEqual(output_frames[0].timestamp, output_frames[2].timestamp)
+		self.assertEqual(b"exec_error\n", bytes(exec_stderr_frames[-1].payload))
+
+	def test_cpuset_scheduler_reserve_and_release(self):
+
+		cpuset_scheduler = DockerCpusetScheduler(
+			cpu_indexes=[0, 1, 2, 3]
+		)
+
+		first_cpuset_reservation = cpuset_scheduler.reserve(
+			cpus_total=3
+		)
+
+		self.assertEqual([0, 1, 2], first_cpuset_reservation.get_cpu_indexes())
+		self.assertEqual([3], cpuset_scheduler.get_available_cpu_indexes())
+
+		with self.assertRaises(DockerCpusetUnavailableException):
+			cpuset_scheduler.reserve(
+				cpus_total=2
+			)
+
+		first_cpuset_reservation.release()
+		first_cpuset_reservation.release()
+
+		second_cpuset_reservation = cpuset_scheduler.reserve(
+			cpus_total=2
+		)
+
+		self.assertEqual("0,1", second_cpuset_reservation.get_cpuset_cpus())
+		self.assertEqual([2, 3], cpuset_scheduler.get_available_cpu_indexes())
+
+	def test_container_table_reuses_freed_rows(self):
+
+		docker_container_table = DockerContainerTable()
+
+		row_indexes = []
+		for index in range(1000):
+			row_indexes.append(docker_container_table.add_row(
+				status=DockerContainerStatus.Running
+			))
+
+		self.assertEqual(list(range(1000)), row_indexes)
+		self.assertEqual(1000, docker_container_table.get_rows_total())
+
+		docker_container_table.set_logs_sent_length(
+			row_index=10,
+			logs_sent_length=2 ** 40
+		)
+		docker_container_table.set_status(
+			row_index=11,
+			status=DockerContainerStatus.Exited
+		)
+		docker_container_table.remove_row(
+			row_index=10
+		)
+
+		self.assertEqual(999, docker_container_table.get_rows_total())
+		self.assertEqual({
+			DockerContainerStatus.Created: 0,
+			DockerContainerStatus.Running: 998,
+			DockerContainerStatus.Exited: 1,
+			DockerContainerStatus.Removed: 0
+		}, docker_container_table.get_status_totals())
+
+		row_index = docker_container_table.add_row(
+			status=DockerContainerStatus.Created
+		)
+
+		self.assertEqual(10, row_index)
+		self.assertEqual(0, docker_container_table.get_logs_sent_length(
+			row_index=row_index
+		))
+		self.assertEqual(DockerContainerStatus.Created, docker_container_table.get_status(
+			row_index=row_index
+		))
+
+	def test_container_instance_rows_in_manager_table(self):
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False
+		)
+
+		docker_container_instance = docker_manager.start(
+			name="test_helloworld"
+		)
+
+		self.assertFalse(hasattr(docker_container_instance, "__dict__"))
+		self.assertEqual(1, docker_manager.get_docker_container_table().get_rows_total())
+		self.assertEqual(docker_container_instance.get_container_id(), docker_container_instance.get_attrs()["Id"])
+
+		docker_container_instance.wait()
+
+		self.assertFalse(docker_container_instance.is_running())
+
+		docker_container_instance.remove()
+
+		del docker_container_instance
+		gc.collect()
+
+		self.assertEqual(0, docker_manager.get_docker_container_table().get_rows_total())
+
+		docker_manager.dispose()
+
+	def test_start_with_resource_limits_and_cpuset_scheduler(self):
+
+		cpuset_scheduler = DockerCpusetScheduler()
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/waits_five_seconds",
+			is_docker_socket_needed=False,
+			cpuset_scheduler=cpuset_scheduler
+		)
+
+		docker_container_instance = docker_manager.start(
+			name="test_waits_five_seconds",
+			resource_limits=DockerContainerResourceLimits(
+				memory_limit_bytes=256 * 1024 * 1024,
+				pids_limit=64
+			),
+			cpus_total=1
+		)
+
+		available_cpu_indexes_total = len(cpuset_scheduler.get_available_cpu_indexes())
+
+		docker_client = docker.from_env()
+		host_config = docker_client.containers.get("test_waits_five_seconds").attrs["HostConfig"]
+		docker_client.close()
+
+		docker_container_instance.stop()
+		docker_container_instance.remove()
+		docker_manager.dispose()
+
+		self.assertEqual(len(cpuset_scheduler.get_cpu_indexes()) - 1, available_cpu_indexes_total)
+		self.assertEqual(len(cpuset_scheduler.get_cpu_indexes()), len(cpuset_scheduler.get_available_cpu_indexes()))
+		self.assertEqual(str(cpuset_scheduler.get_cpu_indexes()[0]), host_config["CpusetCpus"])
+		self.assertEqual(256 * 1024 * 1024, host_config["Memory"])
+		self.assertEqual(64, host_config["PidsLimit"])
+
+	def test_cluster_placement_on_stand_in_daemons(self):
+
+		temp_directory = tempfile.TemporaryDirectory()
+
+		stand_in_docker_daemons = [
+			StandInDockerDaemon(
+				socket_file_path=os.path.join(temp_directory.name, "first.sock"),
+				daemon_info={"ContainersRunning": 5, "NCPU": 16}
+			),
+			StandInDockerDaemon(
+				socket_file_path=os.path.join(temp_directory.name, "second.sock"),
+				daemon_info={"ContainersRunning": 1, "NCPU": 1}
+			)
+		]
+
+		# a daemon that cannot be reached is skipped rather than failing every placement
+		docker_base_urls = [stand_in_docker_daemon.get_docker_base_url() for stand_in_docker_daemon in stand_in_docker_daemons] + [
+			f"unix://{os.path.join(temp_directory.name, 'unreachable.sock')}"
+		]
+
+		running_containers_total_docker_cluster = DockerCluster(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			docker_base_urls=docker_base_urls,
+			placement_strategy=DockerClusterPlacementStrategy.RunningContainersTotal
+		)
+
+		running_containers_per_cpu_docker_cluster = DockerCluster(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			docker_base_urls=docker_base_urls,
+			placement_strategy=DockerClusterPlacementStrategy.RunningContainersPerCpu
+		)
+
+		running_containers_total_docker_manager = running_containers_total_docker_cluster.get_least_loaded_docker_manager()
+		running_containers_per_cpu_docker_manager = running_containers_per_cpu_docker_cluster.get_least_loaded_docker_manager()
+
+		self.assertIs(running_containers_total_docker_cluster.get_docker_managers()[1], running_containers_total_docker_manager)
+		self.assertIs(running_containers_per_cpu_docker_cluster.get_docker_managers()[0], running_containers_per_cpu_docker_manager)
+
+		running_containers_total_docker_cluster.dispose()
+		running_containers_per_cpu_docker_cluster.dispose()
+
+		for stand_in_docker_daemon in stand_in_docker_daemons:
+			stand_in_docker_daemon.dispose()
+
+		temp_directory.cleanup()
+
+	def test_tracer_nests_engine_calls_on_stand_in_daemon(self):
+
+		temp_directory = tempfile.TemporaryDirectory()
+
+		stand_in_docker_daemon = StandInDockerDaemon(
+			socket_file_path=os.path.join(temp_directory.name, "first.sock"),
+			daemon_info={"ContainersRunning": 5, "NCPU": 16}
+		)
+
+		trace_file_path = os.path.join(temp_directory.name, "trace.jsonl")
+
+		tracer = DockerTracer(
+			exporter=DockerFileTraceExporter(
+				file_path=trace_file_path
+			)
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			docker_base_url=stand_in_docker_daemon.get_docker_base_url(),
+			tracer=tracer
+		)
+
+		daemon_info = docker_manager.get_daemon_info()
+
+		docker_manager.dispose()
+		tracer.get_exporter().close()
+
+		with open(trace_file_path, "r") as trace_file_handle:
+			spans = [json.loads(line) for line in trace_file_handle]
+
+		stand_in_docker_daemon.dispose()
+		temp_directory.cleanup()
+
+		span_per_name = {span["name"]: span for span in spans}
+
+		self.assertEqual(5, daemon_info["ContainersRunning"])
+		self.assertIn("DockerManager.get_daemon_info", span_per_name)
+		self.assertIn("DockerManager.dispose", span_per_name)
+		get_daemon_info_span = span_per_name["DockerManager.get_daemon_info"]
+		engine_spans = [span for span in spans if span["name"] == "engine GET"]
+		self.assertEqual(["/v1.41/info"], [span["attributes"]["http.path"] for span in engine_spans])
+		for engine_span in engine_spans:
+			self.assertEqual(get_daemon_info_span["span_id"], engine_span["parent_span_id"])
+			self.assertEqual(get_daemon_info_span["trace_id"], engine_span["trace_id"])
+			self.assertEqual(200, engine_span["attributes"]["http.status_code"])
+		self.assertIsNone(get_daemon_info_span["parent_span_id"])
+		self.assertNotEqual(get_daemon_info_span["trace_id"], span_per_name["DockerManager.dispose"]["trace_id"])
+
+	def test_tracer_spans_for_execute_command_duplicate(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			trace_file_path = os.path.join(temp_directory_path, "trace.jsonl")
+
+			tracer = DockerTracer(
+				exporter=DockerFileTraceExporter(
+					file_path=trace_file_path
+				)
+			)
+
+			docker_manager = DockerManager(
+				dockerfile_directory_path="./dockerfiles/helloworld",
+				is_docker_socket_needed=False,
+				tracer=tracer
+			)
+
+			docker_container_instance = docker_manager.start(
+				name="test_helloworld"
+			)
+
+			docker_container_instance.wait()
+
+			docker_container_instance.execute_command(
+				command="echo traced"
+			)
+
+			docker_container_instance.remove()
+
+			docker_manager.dispose()
+			tracer.get_exporter().close()
+
+			with open(trace_file_path, "r") as trace_file_handle:
+				spans = [json.loads(line) for line in trace_file_handle]
+
+		execute_command_span = [span for span in spans if span["name"] == "DockerContainerInstance.execute_command"][0]
+		child_span_names = set(span["name"] for span in spans if span["parent_span_id"] == execute_command_span["span_id"])
+
+		self.assertTrue(execute_command_span["attributes"]["is_duplicate_required"])
+		self.assertEqual("test_helloworld", execute_command_span["attributes"]["container.name"])
+		self.assertEqual("echo traced", execute_command_span["attributes"]["argument.command"])
+		self.assertIn("DockerContainerInstance.duplicate_container", child_span_names)
+		self.assertIn("engine POST", child_span_names)
+
+	def test_cluster_start_routes_instance_to_placed_daemon(self):
+
+		docker_cluster = DockerCluster(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			docker_base_urls=[
+				"unix://var/run/docker.sock",
+				"unix:///var/run/docker.sock"
+			],
+			cpuset_schedulers=[
+				DockerCpusetScheduler(
+					cpu_indexes=[0]
+				),
+				DockerCpusetScheduler(
+					cpu_indexes=[0]
+				)
+			]
+		)
+
+		docker_container_instance = docker_cluster.start(
+			name="test_helloworld",
+			cpus_total=1
+		)
+
+		docker_container_instance.wait()
+
+		stdout = docker_container_instance.get_stdout()
+		cpuset_cpus = docker_container_instance.get_resource_limits().get_cpuset_cpus()
+
+		with self.assertRaises(DockerContainerInstanceAlreadyExistsException):
+			docker_cluster.start(
+				name="test_helloworld"
+			)
+
+		docker_container_instance.stop()
+		docker_container_instance.remove()
+		docker_cluster.dispose()
+
+		self.assertEqual(b"Hello world!\n", stdout)
+		self.assertEqual("0", cpuset_cpus)
+
+	def test_stats_sampler_print_every_second_for_ten_seconds(self):
+
+		stats_sampler = DockerContainerStatsSampler(
+			samples_total=10
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/print_every_second_for_ten_seconds",
+			is_docker_socket_needed=False,
+			stats_sampler=stats_sampler
+		)
+
+		docker_container_instance = docker_manager.start(
+			name="test_print_every_second_for_ten_seconds"
+		)
+
+		self.assertTrue(stats_sampler.is_subscribed(
+			docker_container_instance=docker_container_instance
+		))
+
+		time.sleep(5)
+
+		current_sample = stats_sampler.get_current_sample(
+			docker_container_instance=docker_container_instance
+		)
+		stats_window = stats_sampler.get_window(
+			docker_container_instance=docker_container_instance,
+			seconds=3
+		)
+
+		docker_container_instance.stop()
+		docker_container_instance.remove()
+
+		time.sleep(1)
+
+		is_subscribed_after_remove = stats_sampler.is_subscribed(
+			docker_container_instance=docker_container_instance
+		)
+		stats_window_after_remove = stats_sampler.get_window(
+			docker_container_instance=docker_container_instance,
+			seconds=10
+		)
+
+		stats_sampler.unsubscribe(
+			docker_container_instance=docker_container_instance
+		)
+
+		is_subscribed_after_unsubscribe = stats_sampler.is_subscribed(
+			docker_container_instance=docker_container_instance
+		)
+
+		stats_sampler.dispose()
+		docker_manager.dispose()
+
+		self.assertIsNotNone(current_sample)
+		self.assertGreater(current_sample.memory_usage_bytes, 0)
+		self.assertGreaterEqual(stats_window.samples_total, 2)
+		self.assertLessEqual(stats_window.seconds, 3)
+		self.assertTrue(is_subscribed_after_remove)
+		self.assertGreaterEqual(stats_window_after_remove.samples_total, stats_window.samples_total)
+		self.assertFalse(is_subscribed_after_unsubscribe)
+
+	def test_log_archive_random_access_by_line_and_time(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			file_path = os.path.join(temp_directory_path, "test.log.gz")
+
+			log_archive_writer = DockerContainerLogArchiveWriter(
+				file_path=file_path,
+				block_size_bytes=4096
+			)
+			for line_index in range(100000):
+				log_archive_writer.append(
+					stream_type=DockerOutputStreamType.Stderr if line_index % 3 == 0 else DockerOutputStreamType.Stdout,
+					timestamp=1000.0 + line_index,
+					payload=f"line {line_index}\n".encode()
+				)
+			log_archive_writer.close()
+
+			# reopening continues the line numbering
+			log_archive_writer = DockerContainerLogArchiveWriter(
+				file_path=file_path
+			)
+			log_archive_writer.append(
+				stream_type=DockerOutputStreamType.Stdout,
+				timestamp=200000.0,
+				payload=b"last line\n"
+			)
+			log_archive_writer.close()
+
+			log_archive = DockerContainerLogArchive(
+				file_path=file_path
+			)
+
+			lines_total = log_archive.get_lines_total()
+			line_payloads = [bytes(frame.payload) for frame in log_archive.get_frames_by_line(
+				start_line_index=54321,
+				end_line_index=54324
+			)]
+			time_frames = list(log_archive.get_frames(
+				stream_type=DockerOutputStreamType.Stderr,
+				start_timestamp=51000.0,
+				end_timestamp=51003.0
+			))
+			last_frames = list(log_archive.get_frames_by_line(
+				start_line_index=100000
+			))
+
+			import gzip
+			with gzip.open(file_path) as file_handle:
+				archive_content = file_handle.read()
+
+		self.assertEqual(100001, lines_total)
+		self.assertEqual([b"line 54321\n", b"line 54322\n", b"line 54323\n"], line_payloads)
+		self.assertEqual(1, len(time_frames))
+		self.assertEqual(51001.0, time_frames[0].timestamp)
+		self.assertEqual(b"line 50001\n", bytes(time_frames[0].payload))
+		self.assertEqual(1, len(last_frames))
+		self.assertEqual(b"last line\n", bytes(last_frames[0].payload))
+		self.assertIn(b"line 99999\n", archive_content)
+
+	def test_log_archiver_print_every_second_for_ten_seconds(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			log_archiver = DockerContainerLogArchiver(
+				directory_path=temp_directory_path
+			)
+
+			docker_manager = DockerManager(
+				dockerfile_directory_path="./dockerfiles/print_every_second_for_ten_seconds",
+				is_docker_socket_needed=False,
+				log_archiver=log_archiver
+			)
+
+			docker_container_instance = docker_manager.start(
+				name="test_print_every_second_for_ten_seconds"
+			)
+
+			self.assertTrue(log_archiver.is_subscribed(
+				docker_container_instance=docker_container_instance
+			))
+
+			docker_container_instance.wait()
+			docker_container_instance.remove()
+
+			time.sleep(2)
+
+			is_subscribed_after_remove = log_archiver.is_subscribed(
+				docker_container_instance=docker_container_instance
+			)
+
+			log_archive = log_archiver.get_archive(
+				docker_container_instance=docker_container_instance
+			)
+			lines_total = log_archive.get_lines_total()
+			payloads = [bytes(frame.payload) for frame in log_archive.get_frames_by_line()]
+			frames = list(log_archive.get_frames_by_line())
+			middle_payloads = [bytes(frame.payload) for frame in log_archive.get_frames(
+				start_timestamp=frames[3].timestamp,
+				end_timestamp=frames[5].timestamp
+			)]
+
+			log_archiver.dispose()
+			docker_manager.dispose()
+
+		self.assertFalse(is_subscribed_after_remove)
+		self.assertEqual(10, lines_total)
+		self.assertEqual([f"{index}\n".encode() for index in range(10)], payloads)
+		self.assertEqual([b"3\n", b"4\n", b"5\n"], middle_payloads)
+
+	def test_log_archiver_stops_following_exited_container(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			log_archiver = DockerContainerLogArchiver(
+				directory_path=temp_directory_path
+			)
+
+			docker_manager = DockerManager(
+				dockerfile_directory_path="./dockerfiles/print_every_second_for_ten_seconds",
+				is_docker_socket_needed=False,
+				log_archiver=log_archiver
+			)
+
+			docker_container_instance = docker_manager.start(
+				name="test_print_every_second_for_ten_seconds"
+			)
+			docker_container_instance.wait()
+
+			time.sleep(2)
+
+			is_subscribed_after_exit = log_archiver.is_subscribed(
+				docker_container_instance=docker_container_instance
+			)
+			lines_total_after_exit = log_archiver.get_archive(
+				docker_container_instance=docker_container_instance
+			).get_lines_total()
+
+			# the archive of a container that is started again continues from its last archived line
+			docker_container_instance.start()
+			log_archiver.subscribe(
+				docker_container_instance=docker_container_instance
+			)
+			docker_container_instance.wait()
+
+			time.sleep(2)
+
+			is_subscribed_after_second_exit = log_archiver.is_subscribed(
+				docker_container_instance=docker_container_instance
+			)
+			payloads = [bytes(frame.payload) for frame in log_archiver.get_archive(
+				docker_container_instance=docker_container_instance
+			).get_frames_by_line()]
+
+			docker_container_instance.remove()
+			log_archiver.dispose()
+			docker_manager.dispose()
+
+		self.assertFalse(is_subscribed_after_exit)
+		self.assertEqual(10, lines_total_after_exit)
+		self.assertFalse(is_subscribed_after_second_exit)
+		self.assertEqual([f"{index}\n".encode() for index in range(10)] * 2, payloads)
+
+	def test_log_archive_writer_flushes_old_block(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			file_path = os.path.join(temp_directory_path, "test.log.gz")
+
+			log_archive_writer = DockerContainerLogArchiveWriter(
+				file_path=file_path,
+				maximum_block_age_seconds=0.1
+			)
+			log_archive_writer.append(
+				stream_type=DockerOutputStreamType.Stdout,
+				timestamp=1000.0,
+				payload=b"first\n"
+			)
+			log_archive_writer.flush()
+			log_archive_writer.append(
+				stream_type=DockerOutputStreamType.Stdout,
+				timestamp=1001.0,
+				payload=b"second\n"
+			)
+			lines_total_before_expired = DockerContainerLogArchive(
+				file_path=file_path
+			).get_lines_total()
+			time.sleep(0.2)
+			is_block_expired = log_archive_writer.is_block_expired()
+			log_archive_writer.append(
+				stream_type=DockerOutputStreamType.Stdout,
+				timestamp=1002.0,
+				payload=b"third\n"
+			)
+			lines_total_after_expired = DockerContainerLogArchive(
+				file_path=file_path
+			).get_lines_total()
+			log_archive_writer.close()
+
+		self.assertEqual(1, lines_total_before_expired)
+		self.assertTrue(is_block_expired)
+		self.assertEqual(3, lines_total_after_expired)
+
+	def test_output_frame_buffer_drops_oldest_frames(self):
+
+		output_frame_buffer = DockerOutputFrameBuffer(
+			maximum_payload_bytes_total=16
+		)
+		for index in range(10):
+			block = f"line {index}\n".encode()
+			output_frame_buffer.append(
+				stream_type=DockerOutputStreamType.Stdout,
+				timestamp=1000.0 + index,
+				block=block
+			)
+
+		self.assertEqual(2, len(output_frame_buffer))
+		self.assertEqual([b"line 8\n", b"line 9\n"], [bytes(output_frame.payload) for output_frame in output_frame_buffer.get_frames()])
+		self.assertEqual([b"line 9\n"], [bytes(output_frame.payload) for output_frame in output_frame_buffer.get_frames(start_timestamp=1009.0)])
+		self.assertEqual([], list(output_frame_buffer.get_frames(end_timestamp=1007.0)))
+
+		extended_output_frame_buffer = DockerOutputFrameBuffer()
+		extended_output_frame_buffer.extend(
+			output_frame_buffer=output_frame_buffer
+		)
+
+		self.assertEqual([b"line 8\n", b"line 9\n"], [bytes(output_frame.payload) for output_frame in extended_output_frame_buffer.get_frames()])
+
+	def test_log_archiver_quiet_running_container(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			log_archiver = DockerContainerLogArchiver(
+				directory_path=temp_directory_path
+			)
+
+			docker_manager = DockerManager(
+				dockerfile_directory_path="./dockerfiles/ready_after_two_seconds",
+				is_docker_socket_needed=False,
+				log_archiver=log_archiver
+			)
+
+			docker_container_instance = docker_manager.start(
+				name="test_ready_after_two_seconds"
+			)
+
+			time.sleep(5)
+
+			# the single line is archived while the container is still running and silent
+			lines_total_while_running = log_archiver.get_archive(
+				docker_container_instance=docker_container_instance
+			).get_lines_total()
+
+			unsubscribe_start_time = time.perf_counter()
+			log_archiver.unsubscribe(
+				docker_container_instance=docker_container_instance
+			)
+			unsubscribe_seconds = time.perf_counter() - unsubscribe_start_time
+
+			docker_container_instance.stop()
+			docker_container_instance.remove()
+			log_archiver.dispose()
+			docker_manager.dispose()
+
+		self.assertEqual(1, lines_total_while_running)
+		self.assertLess(unsubscribe_seconds, 3)
+
+	def test_start_ready_after_two_seconds(self):
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/ready_after_two_seconds",
+			is_docker_socket_needed=False
+		)
+
+		ready_seconds = []
+		for ready in [
+			DockerExecReadinessProbe(
+				command="test -f /ready"
+			),
+			DockerTcpReadinessProbe(
+				container_port=8080
+			),
+			DockerLogPatternReadinessProbe(
+				pattern=b"listening"
+			),
+			DockerHealthcheckReadinessProbe()
+		]:
+			start_time = time.perf_counter()
+			docker_container_instance = docker_manager.start(
+				name="test_ready_after_two_seconds",
+				ready=ready,
+				ready_timeout_seconds=30
+			)
+			ready_seconds.append(time.perf_counter() - start_time)
+			is_ready = ready.is_ready(
+				docker_container_instance=docker_container_instance
+			)
+			docker_container_instance.remove(
+				is_forced=True
+			)
+			self.assertTrue(is_ready)
+
+		with self.assertRaises(DockerContainerNotReadyException):
+			docker_manager.start(
+				name="test_ready_after_two_seconds",
+				ready=DockerExecReadinessProbe(
+					command="test -f /never"
+				),
+				ready_timeout_seconds=1
+			)
+
+		is_container_exists_after_not_ready = docker_manager.is_container_exists(
+			name="test_ready_after_two_seconds"
+		)
+
+		docker_manager.dispose()
+
+		for seconds in ready_seconds:
+			self.assertGreaterEqual(seconds, 2)
+		self.assertFalse(is_container_exists_after_not_ready)
+
+	def test_start_scheduler_shares_concurrent_builds(self):
+
+		start_scheduler = DockerStartScheduler(
+			maximum_concurrent_builds_total=1,
+			maximum_concurrent_starts_total=1
+		)
+
+		def wait_for(condition):
+			timeout_time = time.perf_counter() + 10
+			while not condition():
+				if time.perf_counter() > timeout_time:
+					raise Exception(f"Condition not met in time.")
+				time.sleep(0.01)
+
+		build_started_event = threading.Event()
+		build_release_event = threading.Event()
+		build_calls_total = [0]
+
+		def build_function() -> str:
+			build_calls_total[0] += 1
+			build_started_event.set()
+			build_release_event.wait()
+			return "image_id"
+
+		build_results = []
+		build_results_lock = threading.Lock()
+
+		def build(priority: DockerStartPriority):
+			build_result = start_scheduler.build(
+				build_key="build_key",
+				priority=priority,
+				build_function=build_function
+			)
+			with build_results_lock:
+				build_results.append(build_result)
+
+		build_threads = [threading.Thread(target=build, args=(DockerStartPriority.Normal,))]
+		build_threads[0].start()
+		build_started_event.wait()
+		# these arrive while the first build is in flight, so they wait on it instead of building again
+		for priority in [DockerStartPriority.High, DockerStartPriority.Low]:
+			build_thread = threading.Thread(target=build, args=(priority,))
+			build_thread.start()
+			build_threads.append(build_thread)
+		wait_for(lambda: start_scheduler.get_metrics().builds_shared_total == 2)
+		build_release_event.set()
+		for build_thread in build_threads:
+			build_thread.join()
+
+		start_release_event = threading.Event()
+		admitted_names = []
+
+		def start(name: str, priority: DockerStartPriority):
+			def start_function():
+				admitted_names.append(name)
+				if name == "holding":
+					start_release_event.wait()
+			start_scheduler.start(
+				priority=priority,
+				start_function=start_function
+			)
+
+		start_threads = [threading.Thread(target=start, args=("holding", DockerStartPriority.Low))]
+		start_threads[0].start()
+		wait_for(lambda: start_scheduler.get_metrics().starts_running_total == 1)
+		# every waiter is queued behind the held permit before it is released, so only priority and then arrival decide the order
+		for waiting_total, (name, priority) in enumerate([("low", DockerStartPriority.Low), ("first_normal", DockerStartPriority.Normal), ("high", DockerStartPriority.High), ("second_normal", DockerStartPriority.Normal)], start=1):
+			start_thread = threading.Thread(target=start, args=(name, priority))
+			start_thread.start()
+			start_threads.append(start_thread)
+			wait_for(lambda: start_scheduler.get_metrics().starts_waiting_total == waiting_total)
+		start_release_event.set()
+		for start_thread in start_threads:
+			start_thread.join()
+
+		start_scheduler_metrics = start_scheduler.get_metrics()
+
+		self.assertEqual(1, build_calls_total[0])
+		self.assertEqual(["image_id"] * 3, build_results)
+		self.assertEqual(2, start_scheduler_metrics.builds_shared_total)
+		self.assertEqual(0, start_scheduler_metrics.builds_running_total)
+		self.assertEqual(["holding", "high", "first_normal", "second_normal", "low"], admitted_names)
+		self.assertEqual(0, start_scheduler_metrics.starts_waiting_total)
+		self.assertEqual(0, start_scheduler_metrics.rejected_total)
+
+	def test_start_scheduler_concurrent_starts(self):
+
+		start_scheduler = DockerStartScheduler(
+			maximum_concurrent_builds_total=1,
+			maximum_concurrent_starts_total=1
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			start_scheduler=start_scheduler
+		)
+
+		docker_container_instances = []
+		docker_container_instances_lock = threading.Lock()
+
+		def start_container(name: str, priority: DockerStartPriority):
+			docker_container_instance = docker_manager.start(
+				name=name,
+				priority=priority
+			)
+			with docker_container_instances_lock:
+				docker_container_instances.append(docker_container_instance)
+
+		start_threads = []
+		for name, priority in [("test_helloworld", DockerStartPriority.Low), ("test_helloworld_2", DockerStartPriority.High), ("test_helloworld_3", DockerStartPriority.Normal)]:
+			start_thread = threading.Thread(target=start_container, args=(name, priority))
+			start_thread.start()
+			start_threads.append(start_thread)
+
+		for start_thread in start_threads:
+			start_thread.join()
+
+		start_scheduler_metrics = start_scheduler.get_metrics()
+
+		stdouts = []
+		for docker_container_instance in docker_container_instances:
+			docker_container_instance.wait()
+			stdouts.append(docker_container_instance.get_stdout())
+			docker_container_instance.stop()
+			docker_container_instance.remove()
+
+		docker_manager.dispose()
+
+		self.assertEqual([b"Hello world!\n"] * 3, stdouts)
+		self.assertEqual(0, start_scheduler_metrics.builds_running_total)
+		self.assertEqual(0, start_scheduler_metrics.starts_running_total)
+		self.assertEqual(0, start_scheduler_metrics.starts_waiting_total)
+		self.assertEqual(0, start_scheduler_metrics.rejected_total)
+
+	def test_recycle_container_under_new_name(self):
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			maximum_reuses_total=1
+		)
+
+		first_docker_container_instance = docker_manager.start(
+			name="test_helloworld"
+		)
+
+		first_docker_container_instance.wait()
+
+		first_docker_container_instance.execute_command(
+			command="mkdir test_directory"
+		)
+
+		first_stdout = first_docker_container_instance.get_stdout()
+
+		docker_manager.recycle(
+			docker_container_instance=first_docker_container_instance
+		)
+
+		self.assertEqual(1, docker_manager.get_recyclable_total())
+
+		second_docker_container_instance = docker_manager.start(
+			name="test_helloworld_2"
+		)
+
+		self.assertEqual(0, docker_manager.get_recyclable_total())
+
+		second_docker_container_instance.wait()
+
+		second_docker_container_instance.execute_command(
+			command="ls"
+		)
+
+		second_stdout = second_docker_container_instance.get_stdout()
+
+		is_first_image_exists = docker_manager.is_image_exists(
+			name="test_helloworld"
+		)
+
+		# the maximum reuses are exhausted, so recycling removes the container
+		docker_manager.recycle(
+			docker_container_instance=second_docker_container_instance
+		)
+
+		self.assertEqual(0, docker_manager.get_recyclable_total())
+
+		with self.assertRaises(DockerContainerAlreadyRemovedException):
+			second_docker_container_instance.start()
+
+		docker_manager.dispose()
+
+		self.assertIs(first_docker_container_instance, second_docker_container_instance)
+		self.assertEqual(1, second_docker_container_instance.get_reuses_total())
+		self.assertEqual(b"Hello world!\n", first_stdout)
+		self.assertTrue(second_stdout.startswith(b"Hello world!\n"))
+		self.assertNotIn(b"test_directory", second_stdout)
+		self.assertFalse(is_first_image_exists)
+
+	def test_recycle_container_keeps_stats_and_log_archive(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			stats_sampler = DockerContainerStatsSampler()
+			log_archiver = DockerContainerLogArchiver(
+				directory_path=temp_directory_path
+			)
+
+			docker_manager = DockerManager(
+				dockerfile_directory_path="./dockerfiles/ready_after_two_seconds",
+				is_docker_socket_needed=False,
+				maximum_reuses_total=1,
+				stats_sampler=stats_sampler,
+				log_archiver=log_archiver
+			)
+
+			first_docker_container_instance = docker_manager.start(
+				name="test_ready_after_two_seconds"
+			)
+			first_file_path = log_archiver.get_archive(
+				docker_container_instance=first_docker_container_instance
+			).get_file_path()
+
+			time.sleep(4)
+
+			docker_manager.recycle(
+				docker_container_instance=first_docker_container_instance
+			)
+
+			second_docker_container_instance = docker_manager.start(
+				name="test_ready_after_two_seconds_2"
+			)
+
+			time.sleep(4)
+
+			is_stats_subscribed = stats_sampler.is_subscribed(
+				docker_container_instance=second_docker_container_instance
+			)
+			is_log_archive_subscribed = log_archiver.is_subscribed(
+				docker_container_instance=second_docker_container_instance
+			)
+			second_log_archive = log_archiver.get_archive(
+				docker_container_instance=second_docker_container_instance
+			)
+			second_lines_total = second_log_archive.get_lines_total()
+			first_lines_total = DockerContainerLogArchive(
+				file_path=first_file_path
+			).get_lines_total()
+
+			second_docker_container_instance.remove(
+				is_forced=True
+			)
+			log_archiver.dispose()
+			stats_sampler.dispose()
+			docker_manager.dispose()
+
+		self.assertIs(first_docker_container_instance, second_docker_container_instance)
+		self.assertTrue(is_stats_subscribed)
+		self.assertTrue(is_log_archive_subscribed)
+		self.assertNotEqual(first_file_path, second_log_archive.get_file_path())
+		self.assertEqual(1, first_lines_total)
+		self.assertEqual(1, second_lines_total)
+
+	def test_reset_failure_releases_cpuset(self):
+
+		cpuset_scheduler = DockerCpusetScheduler(
+			cpu_indexes=[0]
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			cpuset_scheduler=cpuset_scheduler
+		)
+
+		blocking_docker_container_instance = docker_manager.start(
+			name="test_helloworld_2"
+		)
+
+		docker_container_instance = docker_manager.start(
+			name="test_helloworld",
+			cpus_total=1
+		)
+		docker_container_instance.wait()
+
+		# the name is taken by another container, so the replacement container cannot be created
+		with self.assertRaises(Exception):
+			docker_container_instance.reset(
+				name="test_helloworld_2"
+			)
+
+		available_cpu_indexes = cpuset_scheduler.get_available_cpu_indexes()
+
+		with self.assertRaises(DockerContainerAlreadyRemovedException):
+			docker_container_instance.remove()
+
+		blocking_docker_container_instance.remove()
+		docker_manager.dispose()
+
+		self.assertEqual([0], available_cpu_indexes)
+
+	def test_pip_cache_volume_with_stand_in_package_index(self):
+
+		temp_directory = tempfile.TemporaryDirectory()
+
+		package_directory_path = os.path.join(temp_directory.name, "simple", "stand-in-package")
+		os.makedirs(package_directory_path)
+
+		wheel_file_name = "stand_in_package-0.1-py3-none-any.whl"
+		wheel_files = {
+			"stand_in_package/__init__.py": b"",
+			"stand_in_package-0.1.dist-info/METADATA": b"Metadata-Version: 2.1\nName: stand-in-package\nVersion: 0.1\n",
+			"stand_in_package-0.1.dist-info/WHEEL": b"Wheel-Version: 1.0\nGenerator: docker_manager_test\nRoot-Is-Purelib: true\nTag: py3-none-any\n"
+		}
+		record_lines = []
+		for wheel_file_path, wheel_file_bytes in wheel_files.items():
+			wheel_file_hash = base64.urlsafe_b64encode(hashlib.sha256(wheel_file_bytes).digest()).rstrip(b"=").decode()
+			record_lines.append(f"{wheel_file_path},sha256={wheel_file_hash},{len(wheel_file_bytes)}")
+		record_lines.append("stand_in_package-0.1.dist-info/RECORD,,")
+		with zipfile.ZipFile(os.path.join(package_directory_path, wheel_file_name), "w") as wheel_zip_file:
+			for wheel_file_path, wheel_file_bytes in wheel_files.items():
+				wheel_zip_file.writestr(wheel_file_path, wheel_file_bytes)
+			wheel_zip_file.writestr("stand_in_package-0.1.dist-info/RECORD", "\n".join(record_lines) + "\n")
+		with open(os.path.join(package_directory_path, "index.html"), "w") as index_file_handle:
+			index_file_handle.write(f"<html><body><a href=\"{wheel_file_name}\">{wheel_file_name}</a></body></html>")
+
+		stand_in_package_index_server = http.server.ThreadingHTTPServer(("0.0.0.0", 0), functools.partial(http.server.SimpleHTTPRequestHandler, directory=temp_directory.name))
+		stand_in_package_index_thread = threading.Thread(target=stand_in_package_index_server.serve_forever, daemon=True)
+		stand_in_package_index_thread.start()
+
+		docker_client = docker.from_env()
+		bridge_gateway = docker_client.networks.get("bridge").attrs["IPAM"]["Config"][0]["Gateway"]
+		docker_client.close()
+
+		pip_cache_volume = DockerCacheVolume.get_pip_cache_volume(
+			name="test_docker_manager_pip_cache",
+			maximum_size_bytes=1,
+			index_url=f"http://{bridge_gateway}:{stand_in_package_index_server.server_address[1]}/simple"
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/contains_script",
+			is_docker_socket_needed=False,
+			cache_volumes=[pip_cache_volume]
+		)
+
+		outputs = []
+		for index in range(2):
+			docker_container_instance = docker_manager.start(
+				name="test_contains_script"
+			)
+			docker_container_instance.wait()
+			docker_container_instance.execute_command(
+				command="pip install stand-in-package"
+			)
+			docker_container_instance.execute_command(
+				command="ls /root/.cache/pip"
+			)
+			outputs.append(docker_container_instance.get_stdout())
+			docker_container_instance.stop()
+			docker_container_instance.remove()
+
+		# builds cannot mount the cache, but they still install from the index it names
+		building_docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/installs_stand_in_package",
+			is_docker_socket_needed=False,
+			cache_volumes=[pip_cache_volume],
+			cache_volume_eviction_interval_seconds=None
+		)
+		building_docker_container_instance = building_docker_manager.start(
+			name="test_installs_stand_in_package"
+		)
+		building_docker_container_instance.wait()
+		building_stdout = building_docker_container_instance.get_stdout()
+		building_docker_container_instance.remove()
+		building_docker_manager.dispose()
+
+		cache_volume_sizes = docker_manager.get_cache_volume_sizes()
+		evicted_cache_volume_names = docker_manager.evict_cache_volumes()
+
+		# refilling the evicted cache puts it over its budget again, which disposing enforces without being asked
+		docker_container_instance = docker_manager.start(
+			name="test_contains_script"
+		)
+		docker_container_instance.wait()
+		docker_container_instance.execute_command(
+			command="pip install stand-in-package"
+		)
+		docker_container_instance.remove()
+
+		docker_manager.dispose()
+
+		docker_client = docker.from_env()
+		volume_names_after_dispose = [volume.name for volume in docker_client.volumes.list()]
+		docker_client.close()
+
+		stand_in_package_index_server.shutdown()
+		stand_in_package_index_server.server_close()
+		temp_directory.cleanup()
+
+		for output in outputs:
+			self.assertIn(b"Successfully installed stand-in-package-0.1", output)
+			self.assertIn(b"http", output)
+		self.assertGreater(cache_volume_sizes["test_docker_manager_pip_cache"], 1)
+		self.assertEqual(["test_docker_manager_pip_cache"], evicted_cache_volume_names)
+		self.assertNotIn("test_docker_manager_pip_cache", volume_names_after_dispose)
+		self.assertEqual(b"imported\n", building_stdout)
+		self.assertNotIn("PIP_CACHE_DIR", pip_cache_volume.get_build_arguments())
+
+	def test_command_result_cache(self):
+
+		temp_directory = tempfile.TemporaryDirectory()
+
+		temp_file = tempfile.NamedTemporaryFile(delete=False)
+		temp_file.write(b"test")
+		temp_file.flush()
+		temp_file.close()
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False,
+			command_result_cache=DockerCommandResultCache(
+				directory_path=temp_directory.name,
+				maximum_size_bytes=1024 * 1024
+			)
+		)
+
+		command_results = []
+		for index in range(3):
+			docker_container_instance = docker_manager.start(
+				name="test_helloworld"
+			)
+			docker_container_instance.wait()
+			if index == 2:
+				docker_container_instance.copy_file(
+					source_file_path=temp_file.name,
+					destination_directory_path="/"
+				)
+			command_results.append(docker_container_instance.execute_command(
+				command="ls /",
+				is_cacheable=True
+			))
+			command_results.append(docker_container_instance.execute_command(
+				command="ls /does_not_exist",
+				is_cacheable=True
+			))
+			docker_container_instance.stop()
+			docker_container_instance.remove()
+
+		docker_manager.dispose()
+
+		os.unlink(temp_file.name)
+		temp_directory.cleanup()
+
+		self.assertEqual([False, False, True, True, False, False], [command_result.is_cached for command_result in command_results])
+		self.assertEqual(command_results[0].output, command_results[2].output)
+		self.assertEqual(command_results[1].output, command_results[3].output)
+		self.assertEqual(0, command_results[2].exit_code)
+		self.assertNotEqual(0, command_results[3].exit_code)
+		self.assertIn(os.path.basename(temp_file.name).encode(), command_results[4].output)
+
+	def test_collect_garbage_of_exited_process_and_remove_many(self):
+
+		exited_process = subprocess.run(
+			[sys.executable, "-c", "import os\nprint(os.getpid())"],
+			capture_output=True,
+			check=True
+		)
+
+		orphaning_docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False
+		)
+
+		orphaned_docker_container_instance = orphaning_docker_manager.start(
+			name="test_helloworld"
+		)
+
+		orphaned_docker_container_instance.wait()
+
+		orphaned_labels = orphaning_docker_manager.get_labels()
+
+		# stands in for a process that crashed after duplicating the container
+		orphaned_duplicate_docker_container_instance = orphaned_docker_container_instance.duplicate_container(
+			name="test_helloworld_2"
+		)
+
+		docker_client = docker.from_env()
+		docker_client.api.commit(
+			orphaned_duplicate_docker_container_instance.get_container_id(),
+			repository="test_helloworld_3",
+			conf={"Labels": {
+				**orphaned_labels,
+				DOCKER_MANAGER_PID_LABEL: exited_process.stdout.decode().strip()
+			}}
+		)
+		docker_client.api.remove_container(orphaned_duplicate_docker_container_instance.get_container_id())
+		docker_client.api.remove_image("test_helloworld_2")
+		orphaned_container = docker_client.containers.create(
+			image="test_helloworld_3",
+			name="test_helloworld_3"
+		)
+
+		docker_manager = DockerManager(
+			dockerfile_directory_path="./dockerfiles/helloworld",
+			is_docker_socket_needed=False
+		)
+
+		garbage_collection_result = docker_manager.collect_garbage()
+
+		is_orphaned_container_exists = len(docker_client.containers.list(all=True, filters={"id": orphaned_container.id})) != 0
+		is_orphaned_image_exists = docker_manager.is_image_exists(
+			name="test_helloworld_3"
+		)
+		is_live_session_container_exists = len(docker_client.containers.list(all=True, filters={"label": f"{DOCKER_MANAGER_SESSION_LABEL}={orphaned_labels[DOCKER_MANAGER_SESSION_LABEL]}"})) != 0
+
+		docker_container_instances = [
+			docker_manager.start(
+				name=f"test_helloworld_{index}"
+			) for index in range(2, 4)
+		]
+
+		docker_manager.remove_many(
+			docker_container_instances=docker_container_instances + [orphaned_docker_container_instance]
+		)
+
+		docker_client.close()
+		docker_manager.dispose()
+		orphaning_docker_manager.dispose()
+
+		self.assertTrue(is_live_session_container_exists)
+		self.assertFalse(is_orphaned_container_exists)
+		self.assertFalse(is_orphaned_image_exists)
+		self.assertEqual(1, garbage_collection_result.containers_removed_total)
+		self.assertLessEqual(1, garbage_collection_result.images_removed_total)
+		for docker_container_instance in docker_container_instances:
+			with self.assertRaises(DockerContainerAlreadyRemovedException):
+				docker_container_instance.get_container_id()
+
+	def test_trace_exporter_and_readiness_probe_are_abstract(self):
+
+		with self.assertRaises(TypeError):
+			DockerTraceExporter()
+		with self.assertRaises(TypeError):
+			DockerReadinessProbe()
+
+	def test_coordinator_slots_shared_through_environment(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			coordinator = DockerCoordinator(
+				directory_path=temp_directory_path,
+				maximum_concurrent_operations_total=2
+			)
+
+			original_environment = dict(os.environ)
+			os.environ[DockerCoordinator.directory_path_environment_variable_name] = temp_directory_path
+			try:
+				nested_coordinator = DockerCoordinator.get_from_environment()
+				nested_docker_manager = DockerManager(
+					dockerfile_directory_path="./dockerfiles/helloworld",
+					is_docker_socket_needed=True
+				)
+			finally:
+				os.environ.clear()
+				os.environ.update(original_environment)
+
+			first_slot = coordinator.acquire_slot()
+			second_slot = nested_coordinator.acquire_slot()
+
+			with self.assertRaises(DockerCoordinatorTimeoutException):
+				nested_coordinator.acquire_slot(
+					timeout_seconds=0.2
+				)
+
+			first_slot.release()
+
+			with nested_coordinator.acquire_slot(
+				timeout_seconds=0.2
+			) as free_slot:
+				free_slot_retries_total = free_slot.get_retries_total()
+
+			third_slot = coordinator.acquire_slot()
+			release_timer = threading.Timer(0.1, second_slot.release)
+			release_timer.start()
+			with nested_coordinator.acquire_slot(
+				timeout_seconds=1
+			) as released_slot:
+				released_slot_retries_total = released_slot.get_retries_total()
+			release_timer.join()
+			third_slot.release()
+
+			shutil.copytree("./dockerfiles/helloworld", os.path.join(temp_directory_path, "helloworld"))
+
+			first_build_key = DockerCoordinator.get_build_key(
+				dockerfile_directory_path="./dockerfiles/helloworld",
+				build_arguments={}
+			)
+			copied_build_key = DockerCoordinator.get_build_key(
+				dockerfile_directory_path=os.path.join(temp_directory_path, "helloworld"),
+				build_arguments={}
+			)
+			build_arguments_build_key = DockerCoordinator.get_build_key(
+				dockerfile_directory_path="./dockerfiles/helloworld",
+				build_arguments={"PIP_INDEX_URL": "http://localhost"}
+			)
+
+		self.assertEqual(2, nested_coordinator.get_maximum_concurrent_operations_total())
+		self.assertIsNotNone(nested_docker_manager.get_coordinator())
+		self.assertEqual(0, free_slot_retries_total)
+		self.assertGreater(released_slot_retries_total, 0)
+		self.assertEqual(first_build_key, copied_build_key)
+		self.assertNotEqual(first_build_key, build_arguments_build_key)
+
+	def test_coordinated_managers_share_one_build(self):
+
+		with tempfile.TemporaryDirectory() as temp_directory_path:
+
+			coordinator = DockerCoordinator(
+				directory_path=os.path.join(temp_directory_path, "coordination"),
+				maximum_concurrent_operations_total=1
+			)
+
+			# the nested manager sees the same Dockerfile under another path, as it would inside its container
+			shutil.copytree("./dockerfiles/helloworld", os.path.join(temp_directory_path, "helloworld"))
+
+			docker_managers = [
+				DockerManager(
+					dockerfile_directory_path=dockerfile_directory_path,
+					is_docker_socket_needed=False,
+					coordinator=coordinator
+				) for dockerfile_directory_path in ["./dockerfiles/helloworld", os.path.join(temp_directory_path, "helloworld")]
+			]
+
+			docker_container_instances = [None, None]
+
+			def start(index: int):
+				docker_container_instances[index] = docker_managers[index].start(
+					name="test_helloworld" if index == 0 else "test_helloworld_2"
+				)
+
+			threads = [threading.Thread(target=start, args=(index,)) for index in range(2)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+
+			inventory = coordinator.get_inventory()
+			image_ids = [docker_container_instance.get_attrs()["Image"] for docker_container_instance in docker_container_instances]
+
+			for docker_container_instance in docker_container_instances:
+				docker_container_instance.wait()
+				docker_container_instance.remove()
+
+			docker_client = docker.from_env()
+			# garbage collection prunes by session label, which the shared image must not carry
+			cache_image_labels = docker_client.api.inspect_image(list(inventory.values())[0]["image_name"])["Config"]["Labels"] or {}
+			for inventory_entry in inventory.values():
+				docker_client.api.remove_image(inventory_entry["image_name"])
+			docker_client.close()
+
+			for docker_manager in docker_managers:
+				docker_manager.dispose()
+
+		self.assertEqual(1, len(inventory))
+		self.assertEqual(image_ids[0], image_ids[1])
+		self.assertEqual(image_ids[0], list(inventory.values())[0]["image_id"])
+		self.assertEqual(list(inventory.keys())[0], cache_image_labels.get(DOCKER_MANAGER_BUILD_CACHE_LABEL))
+		self.assertNotIn(DOCKER_MANAGER_SESSION_LABEL, cache_image_labels)
+
+	def test_import_does_not_import_docker(self):
+
+		completed_process = subprocess.run(
+			[sys.executable, "-c", "import sys\nimport src.austin_heller_repo.docker_manager as docker_manager\ndocker_manager.DockerManager(dockerfile_directory_path='.', is_docker_socket_needed=False)\nprint('docker' in sys.modules)"],
+			cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+			capture_output=True,
+			check=True
+		)
+
+		self.assertEqual(b"False", completed_process.stdout.strip())